@@ -0,0 +1,220 @@
+"""
+Batch analysis of a player's whole game archive.
+
+Every position of every game is evaluated with a UCI engine spread over a
+process pool (one engine per worker). Results are appended to a JSON-lines
+file as each game finishes, so an interrupted run picks up where it stopped.
+
+Usage:
+    python analysis.py <username> --engine stockfish --depth 12 --workers 4
+"""
+
+import argparse
+import io
+import json
+import os
+import shlex
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import util
+
+import chess
+import chess.engine
+import chess.pgn
+import requests
+
+from config import API_URL, log_exception
+
+# Centipawn loss (from the mover's point of view) for each classification
+INACCURACY = 50
+MISTAKE = 100
+BLUNDER = 300
+MATE_SCORE = 10000
+
+# Per-process engine, started once by init_worker
+_engine = None
+_limit = None
+
+
+# -------------------- Worker --------------------
+def init_worker(engine_cmd, depth):
+    global _engine, _limit
+    _engine = chess.engine.SimpleEngine.popen_uci(shlex.split(engine_cmd))
+    _limit = chess.engine.Limit(depth=depth)
+    # Pool workers skip atexit, but run multiprocessing finalizers on exit
+    util.Finalize(None, _engine.quit, exitpriority=16)
+
+
+def evaluate(board):
+    info = _engine.analyse(board, _limit)
+    return info["score"].white().score(mate_score=MATE_SCORE)
+
+
+def classify(loss):
+    if loss >= BLUNDER:
+        return "blunder"
+    if loss >= MISTAKE:
+        return "mistake"
+    if loss >= INACCURACY:
+        return "inaccuracy"
+    return ""
+
+
+def analyse_game(game):
+    game_pgn = chess.pgn.read_game(io.StringIO(game.get("pgn", "")))
+    if game_pgn is None:
+        raise ValueError("Unreadable PGN")
+
+    board = game_pgn.board()
+    before = evaluate(board)
+    moves = []
+    summary = {
+        "white": {"inaccuracy": 0, "mistake": 0, "blunder": 0},
+        "black": {"inaccuracy": 0, "mistake": 0, "blunder": 0},
+    }
+    for ply, move in enumerate(game_pgn.mainline_moves(), start=1):
+        mover = "white" if board.turn == chess.WHITE else "black"
+        san = board.san(move)
+        board.push(move)
+        after = evaluate(board)
+        loss = (before - after) if mover == "white" else (after - before)
+        label = classify(loss)
+        if label:
+            summary[mover][label] += 1
+        moves.append(
+            {
+                "ply": ply,
+                "san": san,
+                "uci": move.uci(),
+                "eval": after,
+                "loss": max(0, loss),
+                "class": label,
+            }
+        )
+        before = after
+
+    return {
+        "uuid": game.get("uuid"),
+        "white": game.get("white", {}).get("username"),
+        "black": game.get("black", {}).get("username"),
+        "moves": moves,
+        "summary": summary,
+    }
+
+
+# -------------------- Results File --------------------
+def load_done(out_path):
+    """uuids already in the results file; a torn last line is ignored"""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["uuid"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def drop_torn_line(out_path):
+    """
+    Cuts a last line left unfinished by an interrupted run, so the next
+    record is not appended onto it
+    """
+    if not os.path.exists(out_path):
+        return
+    with open(out_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        # Scan back from the end for the last complete line
+        pos = end
+        while pos > 0:
+            step = min(pos, 64 * 1024)
+            pos -= step
+            f.seek(pos)
+            cut = f.read(step).rfind(b"\n")
+            if cut >= 0:
+                f.truncate(pos + cut + 1)
+                return
+        f.truncate(0)
+
+
+def fetch_games(username):
+    resp = requests.get(f"{API_URL}/api/chess/games/{username}")
+    games = resp.json()
+    if resp.status_code != 200:
+        raise Exception(games.get("error", "Unknown error"))
+    return games
+
+
+# -------------------- Pipeline --------------------
+def analyse_archive(games, engine_cmd, out_path, depth=12, workers=None):
+    drop_torn_line(out_path)
+    done = load_done(out_path)
+    todo = [g for g in games if g.get("uuid") and g["uuid"] not in done]
+    print(f"{len(games)} games, {len(done)} already analysed, {len(todo)} to go")
+    if not todo:
+        return 0
+
+    start = time.time()
+    finished = 0
+    with open(out_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(engine_cmd, depth),
+    ) as pool:
+        futures = {pool.submit(analyse_game, g): g for g in todo}
+        for future in as_completed(futures):
+            game = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Not written, so the next run retries it
+                log_exception(e)
+                print(f"[skip] {game.get('uuid')}: {e}")
+                continue
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            finished += 1
+            rate = finished / max(time.time() - start, 1e-9) * 60
+            print(
+                f"[{finished}/{len(todo)}] {result['white']} vs {result['black']}  {rate:.1f} games/min"
+            )
+
+    elapsed = time.time() - start
+    print(
+        f"Analysed {finished} games in {elapsed:.1f}s ({finished / max(elapsed, 1e-9) * 60:.1f} games/min)"
+    )
+    return finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse a player's game archive")
+    parser.add_argument("username")
+    parser.add_argument("--engine", required=True, help="UCI engine command")
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="results file (JSON lines)")
+    parser.add_argument(
+        "--games", default=None, help="read games from a JSON file instead of the API"
+    )
+    args = parser.parse_args()
+
+    if args.games:
+        with open(args.games, encoding="utf-8") as f:
+            games = json.load(f)
+    else:
+        games = fetch_games(args.username)
+    out_path = args.out or f"analysis_{args.username}.jsonl"
+    analyse_archive(
+        games, args.engine, out_path, depth=args.depth, workers=args.workers
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,692 @@
+"""
+Game archive download, processing and local storage for the game list.
+
+The archive is fetched as monthly chunks (concurrently) and each chunk is
+parsed incrementally while it streams, so games can be shown as soon as
+they are complete instead of after the whole archive has been read.
+Downloaded games are kept in a per-user GameStore, and later syncs only
+ask the server for games newer than the store's cursor.
+
+Mainlines are also packed into a binary move archive (2 bytes per move)
+that is memory-mapped, so the viewer can jump to any game and ply without
+parsing PGN text.
+
+Usage:
+    python archive.py roundtrip [--games 500]
+"""
+
+import argparse
+import array
+import base64
+import codecs
+import io
+import json
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import chess
+import requests
+from chess import pgn
+
+# Monthly archives downloaded at once
+MONTH_WORKERS = 4
+# Bytes read from the socket per parse step
+STREAM_CHUNK = 16 * 1024
+# Games handed to the UI per callback
+GAME_BATCH = 25
+
+# Bumped whenever the GameStore file layout changes; older files are re-synced
+STORE_VERSION = 2
+
+DRAW_RESULTS = ["agreed", "repetition", "insufficient", "stalemate"]
+
+# chess.com clock comments, e.g. {[%clk 0:02:59.9]}
+CLOCK_COMMENT = re.compile(r"\s*\{\[%clk [^}]*\}")
+
+# Binary move archive layout (little-endian):
+#   file header: magic, version, game count, headers offset, index offset
+#   moves:       u16 per move, bits 0-5 from, 6-11 to, 12-14 promotion piece
+#   headers:     one compact JSON object per game
+#   index:       per game (moves offset, move count, header offset, header length)
+MOVES_MAGIC = b"CHMV"
+MOVES_VERSION = 1
+MOVES_HEADER = struct.Struct("<4sHxxIQQ")
+MOVES_INDEX = struct.Struct("<QIQI")
+
+
+# -------------------- Game Records --------------------
+class GameRecord:
+    """
+    The fields the game list needs, plus the PGN stored zlib-compressed
+    (without clock comments) and only decoded when it is asked for.
+    """
+
+    __slots__ = (
+        "uuid",
+        "white",
+        "black",
+        "display_result",
+        "halfmove_count",
+        "end_time",
+        "pgn_z",
+        "moves_ref",
+    )
+
+    def __init__(
+        self, uuid, white, black, display_result, halfmove_count, end_time, pgn_z
+    ):
+        self.uuid = uuid
+        # Player names and results repeat across the archive; share one copy
+        self.white = sys.intern(white)
+        self.black = sys.intern(black)
+        self.display_result = sys.intern(display_result)
+        self.halfmove_count = halfmove_count
+        self.end_time = end_time
+        self.pgn_z = pgn_z
+        # (MoveArchive, game index) once the game is in the binary archive
+        self.moves_ref = None
+
+    @property
+    def pgn(self):
+        return zlib.decompress(self.pgn_z).decode("utf-8") if self.pgn_z else ""
+
+    def read_mainline(self):
+        """Starting board and mainline moves, from the binary archive if possible"""
+        if self.moves_ref:
+            reader, index = self.moves_ref
+            try:
+                return reader.start_board(index), reader.moves(index)
+            except (ValueError, OSError):
+                # Archive closed or replaced underneath us; fall back to the PGN
+                self.moves_ref = None
+        game_pgn = pgn.read_game(io.StringIO(self.pgn))
+        if game_pgn is None:
+            return chess.Board(), []
+        return game_pgn.board(), list(game_pgn.mainline_moves())
+
+    @classmethod
+    def from_game(cls, g):
+        """Builds a record from an already annotated server game dict"""
+        pgn_text = CLOCK_COMMENT.sub("", g.get("pgn", ""))
+        return cls(
+            g.get("uuid"),
+            g.get("white", {}).get("username", "Unknown"),
+            g.get("black", {}).get("username", "Unknown"),
+            g.get("display_result", ""),
+            g.get("halfmove_count", 0),
+            g.get("end_time") or 0,
+            zlib.compress(pgn_text.encode("utf-8"), 6) if pgn_text else b"",
+        )
+
+    def to_dict(self):
+        return {
+            "uuid": self.uuid,
+            "white": self.white,
+            "black": self.black,
+            "display_result": self.display_result,
+            "halfmove_count": self.halfmove_count,
+            "end_time": self.end_time,
+            "pgn_z": base64.b64encode(self.pgn_z).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            d["uuid"],
+            d["white"],
+            d["black"],
+            d["display_result"],
+            d["halfmove_count"],
+            d["end_time"],
+            base64.b64decode(d["pgn_z"]),
+        )
+
+
+# -------------------- Game Processing --------------------
+def annotate_game(g):
+    """Adds display_result and halfmove_count to a raw game dict"""
+    w_name = g["white"]["username"]
+    b_name = g["black"]["username"]
+    w_res = g["white"].get("result", "")
+    b_res = g["black"].get("result", "")
+    if w_res.lower() in DRAW_RESULTS or b_res.lower() in DRAW_RESULTS:
+        g["display_result"] = f"Draw by {w_res or b_res}"
+    elif w_res != b_res:
+        g["display_result"] = f"{w_name if w_res=='win' else b_name} won"
+    else:
+        g["display_result"] = w_res.capitalize()
+
+    try:
+        pgn_io = io.StringIO(g.get("pgn", ""))
+        game_pgn = pgn.read_game(pgn_io)
+        g["halfmove_count"] = len(list(game_pgn.mainline_moves())) if game_pgn else 0
+    except Exception:
+        g["halfmove_count"] = max(0, len(g.get("pgn", "").split()))
+    return g
+
+
+def make_record(g):
+    return GameRecord.from_game(annotate_game(g))
+
+
+# -------------------- Incremental Parsing --------------------
+def iter_json_array(chunks):
+    """
+    Yields the items of a JSON array from an iterable of text chunks,
+    each one as soon as it has been fully received.
+    - A bare array and a wrapper like {"games": [...]} are both accepted
+      (parsing starts at the first '[')
+    - Only the item currently being received is buffered
+    - Raises ValueError if the stream ends before the closing ']', so a
+      truncated or malformed download is not taken for a complete one
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    started = False
+    for chunk in chunks:
+        buf = buf[pos:] + chunk
+        pos = 0
+        if not started:
+            start = buf.find("[")
+            if start < 0:
+                continue
+            pos = start + 1
+            started = True
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                return
+            try:
+                item, pos = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # Item not complete yet, wait for the next chunk
+                break
+            yield item
+    if not started:
+        raise ValueError("No JSON array in the response")
+    raise ValueError(f"JSON array ended early: {buf[pos:pos + 60]!r}")
+
+
+def iter_text(resp):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for raw in resp.iter_content(chunk_size=STREAM_CHUNK):
+        text = decoder.decode(raw)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def stream_games(url, on_games, http=requests, known=(), keep=None, missing_ok=False):
+    """
+    Streams one archive document, handing GameRecords over in batches.
+    - known: uuids that are already stored; they are skipped, not re-processed
+    - keep: predicate on the raw game dict; games it rejects are skipped too
+    - missing_ok: a 404 is an empty document (a month without games)
+    """
+    with http.get(url, stream=True, timeout=30) as resp:
+        if resp.status_code == 404 and missing_ok:
+            return 0
+        if resp.status_code != 200:
+            try:
+                error = resp.json().get("error", "Unknown error")
+            except Exception:
+                error = f"HTTP {resp.status_code}"
+            raise Exception(error)
+        batch = []
+        count = 0
+        for g in iter_json_array(iter_text(resp)):
+            if (keep and not keep(g)) or g.get("uuid") in known:
+                continue
+            batch.append(make_record(g))
+            if len(batch) >= GAME_BATCH:
+                on_games(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            on_games(batch)
+            count += len(batch)
+    return count
+
+
+# -------------------- Archive Download --------------------
+def month_archives(api_url, username, http=requests):
+    """
+    Monthly archive ids ("YYYY/MM"), newest first, or None when the server
+    only offers the archive as a single document.
+    """
+    try:
+        resp = http.get(f"{api_url}/api/chess/games/{username}/archives", timeout=10)
+    except requests.exceptions.RequestException:
+        return None
+    if resp.status_code != 200:
+        return None
+    data = resp.json()
+    if isinstance(data, dict):
+        data = data.get("archives", [])
+    # Accept chess.com style archive URLs as well as bare "YYYY/MM" ids
+    months = ["/".join(str(m).rstrip("/").split("/")[-2:]) for m in data]
+    return sorted(months, reverse=True)
+
+
+def archive_month(timestamp):
+    """Archive id ("YYYY/MM") of the month `timestamp` falls in"""
+    t = time.gmtime(timestamp)
+    return f"{t.tm_year:04d}/{t.tm_mon:02d}"
+
+
+def download_archive(api_url, username, on_games, months=None, http=requests, known=()):
+    """
+    Downloads a player's games, calling on_games(batch) from worker threads
+    as games arrive. Returns the number of games received.
+    - months: restrict the download to these archive ids; a month the server
+      has no document for counts as empty
+    - known: uuids to skip
+    """
+    if months is None:
+        months = month_archives(api_url, username, http)
+    if months is None:
+        return stream_games(
+            f"{api_url}/api/chess/games/{username}", on_games, http, known
+        )
+
+    with ThreadPoolExecutor(max_workers=MONTH_WORKERS) as pool:
+        futures = [
+            pool.submit(
+                stream_games,
+                f"{api_url}/api/chess/games/{username}/{month}",
+                on_games,
+                http,
+                known,
+                missing_ok=True,
+            )
+            for month in months
+        ]
+        return sum(f.result() for f in futures)
+
+
+# -------------------- Binary Move Archive --------------------
+def encode_move(move):
+    promo = move.promotion - 1 if move.promotion else 0
+    return move.from_square | (move.to_square << 6) | (promo << 12)
+
+
+def decode_move(code):
+    promo = (code >> 12) & 0x7
+    return chess.Move(code & 0x3F, (code >> 6) & 0x3F, promo + 1 if promo else None)
+
+
+def encode_mainline(pgn_text):
+    """(starting FEN or None for the standard position, u16 move codes)"""
+    game_pgn = pgn.read_game(io.StringIO(pgn_text))
+    if game_pgn is None:
+        return None, array.array("H")
+    board = game_pgn.board()
+    fen = None if board == chess.Board() else board.fen()
+    codes = array.array("H", (encode_move(m) for m in game_pgn.mainline_moves()))
+    return fen, codes
+
+
+def export_archive(records, path, previous=None):
+    """
+    Writes the mainlines of `records` to a binary move archive at `path`.
+    - previous: an open MoveArchive whose games are copied as raw move codes
+      instead of being parsed again
+    """
+    known = previous.uuid_index() if previous else {}
+    tmp = path + ".tmp"
+    index = []
+    headers = []
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * MOVES_HEADER.size)
+        for g in records:
+            if g.uuid in known:
+                i = known[g.uuid]
+                fen = previous.header(i).get("fen")
+                raw = previous.move_bytes(i)
+            else:
+                fen, codes = encode_mainline(g.pgn)
+                if sys.byteorder != "little":
+                    codes.byteswap()
+                raw = codes.tobytes()
+            header = {"uuid": g.uuid, "white": g.white, "black": g.black}
+            if fen:
+                header["fen"] = fen
+            index.append([f.tell(), len(raw) // 2])
+            headers.append(json.dumps(header, separators=(",", ":")).encode("utf-8"))
+            f.write(raw)
+
+        headers_offset = f.tell()
+        for entry, header in zip(index, headers):
+            entry += [f.tell(), len(header)]
+            f.write(header)
+
+        index_offset = f.tell()
+        for entry in index:
+            f.write(MOVES_INDEX.pack(*entry))
+
+        f.seek(0)
+        f.write(
+            MOVES_HEADER.pack(
+                MOVES_MAGIC, MOVES_VERSION, len(index), headers_offset, index_offset
+            )
+        )
+    if previous:
+        # A mapped file cannot be replaced on Windows
+        previous.close()
+    os.replace(tmp, path)
+
+
+class MoveArchive:
+    """Memory-mapped reader with random access to any game and ply"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, _, self.index_offset = MOVES_HEADER.unpack_from(
+            self.map, 0
+        )
+        if magic != MOVES_MAGIC or version != MOVES_VERSION:
+            self.close()
+            raise ValueError(f"Not a move archive: {path}")
+        self._uuids = None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def entry(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return MOVES_INDEX.unpack_from(
+            self.map, self.index_offset + i * MOVES_INDEX.size
+        )
+
+    def header(self, i):
+        _, _, offset, length = self.entry(i)
+        return json.loads(self.map[offset : offset + length])
+
+    def uuid_index(self):
+        if self._uuids is None:
+            self._uuids = {self.header(i)["uuid"]: i for i in range(self.count)}
+        return self._uuids
+
+    def halfmove_count(self, i):
+        return self.entry(i)[1]
+
+    def move_bytes(self, i):
+        offset, count, _, _ = self.entry(i)
+        return self.map[offset : offset + count * 2]
+
+    def move_codes(self, i, ply=None):
+        codes = array.array("H")
+        raw = self.move_bytes(i)
+        codes.frombytes(raw if ply is None else raw[: ply * 2])
+        if sys.byteorder != "little":
+            codes.byteswap()
+        return codes
+
+    def moves(self, i, ply=None):
+        return [decode_move(c) for c in self.move_codes(i, ply)]
+
+    def start_board(self, i):
+        fen = self.header(i).get("fen")
+        return chess.Board(fen) if fen else chess.Board()
+
+    def board_at(self, i, ply):
+        board = self.start_board(i)
+        for move in self.moves(i, ply):
+            board.push(move)
+        return board
+
+    def to_pgn(self, i):
+        board = self.board_at(i, None)
+        game = pgn.Game.from_board(board)
+        header = self.header(i)
+        game.headers["White"] = header.get("white", "?")
+        game.headers["Black"] = header.get("black", "?")
+        return str(game)
+
+
+def import_archive(path):
+    """Yields GameRecords (PGN regenerated from the moves) from a move archive"""
+    reader = MoveArchive(path)
+    try:
+        for i in range(len(reader)):
+            header = reader.header(i)
+            pgn_text = reader.to_pgn(i)
+            yield GameRecord(
+                header["uuid"],
+                header.get("white", "Unknown"),
+                header.get("black", "Unknown"),
+                "",
+                reader.halfmove_count(i),
+                0,
+                zlib.compress(pgn_text.encode("utf-8"), 6),
+            )
+    finally:
+        reader.close()
+
+
+# -------------------- Local Store --------------------
+class GameStore:
+    """
+    GameRecords of one player, persisted as JSON, plus the sync cursor
+    (end_time and uuid of the newest game already processed).
+    Mainlines are kept alongside in a binary move archive (<user>.moves).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.moves_path = os.path.splitext(path)[0] + ".moves"
+        self.moves = None
+        self.games = []
+        self.uuids = set()
+        self.cursor = None
+        # True when the server offers monthly archives
+        self.paged = False
+        # Whether ?since= responses came back filtered (None: not tried yet)
+        self.since_filtered = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != STORE_VERSION:
+            return self
+        self.games = [GameRecord.from_dict(d) for d in data.get("games", [])]
+        self.uuids = {g.uuid for g in self.games}
+        self.cursor = data.get("cursor")
+        self.paged = data.get("paged", False)
+        self.since_filtered = data.get("since_filtered")
+        if os.path.exists(self.moves_path):
+            try:
+                self.bind_moves(MoveArchive(self.moves_path))
+            except (ValueError, OSError, struct.error):
+                self.moves = None
+        return self
+
+    def bind_moves(self, reader):
+        self.moves = reader
+        uuids = reader.uuid_index()
+        for g in self.games:
+            i = uuids.get(g.uuid)
+            g.moves_ref = (reader, i) if i is not None else None
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with self.lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": STORE_VERSION,
+                    "cursor": self.cursor,
+                    "paged": self.paged,
+                    "since_filtered": self.since_filtered,
+                    "games": [g.to_dict() for g in self.games],
+                },
+                f,
+            )
+        os.replace(tmp, self.path)
+        with self.lock:
+            games = list(self.games)
+        export_archive(games, self.moves_path, previous=self.moves)
+        self.bind_moves(MoveArchive(self.moves_path))
+
+    def merge(self, batch):
+        """Adds unseen games and advances the cursor; returns the new games"""
+        fresh = []
+        with self.lock:
+            for g in batch:
+                if g.uuid in self.uuids:
+                    continue
+                self.uuids.add(g.uuid)
+                self.games.append(g)
+                fresh.append(g)
+                if self.cursor is None or g.end_time >= self.cursor["end_time"]:
+                    self.cursor = {"end_time": g.end_time, "uuid": g.uuid}
+        return fresh
+
+
+def sync_archive(api_url, username, store, on_games, http=requests):
+    """
+    Fetches the games that are newer than the store's cursor, merges them
+    into the store and saves it. Returns the number of new games.
+    - First sync: the whole archive
+    - Paged server: the months of the archive index from the cursor's month on
+    - Otherwise: one request with ?since=<end_time>. Games older than the
+      cursor are dropped here as well, and store.since_filtered records
+      whether the server did so itself (False: it ignores `since` and sends
+      the whole archive every time)
+    """
+    new = 0
+
+    def on_batch(batch):
+        nonlocal new
+        fresh = store.merge(batch)
+        new += len(fresh)
+        if fresh:
+            on_games(fresh)
+
+    url = f"{api_url}/api/chess/games/{username}"
+    since_filtered = store.since_filtered
+    if store.cursor is None:
+        months = month_archives(api_url, username, http)
+        store.paged = months is not None
+        if months is None:
+            stream_games(url, on_batch, http, store.uuids)
+        else:
+            download_archive(api_url, username, on_batch, months, http, store.uuids)
+    else:
+        since = store.cursor["end_time"]
+        months = month_archives(api_url, username, http) if store.paged else None
+        if months is not None:
+            first = archive_month(since)
+            months = [m for m in months if m >= first]
+            download_archive(api_url, username, on_batch, months, http, store.uuids)
+        else:
+            stale = 0
+
+            def newer(g):
+                nonlocal stale
+                if (g.get("end_time") or 0) < since:
+                    stale += 1
+                    return False
+                return True
+
+            stream_games(f"{url}?since={since}", on_batch, http, store.uuids, newer)
+            store.since_filtered = stale == 0
+
+    if new or store.moves is None or store.since_filtered != since_filtered:
+        store.save()
+    return new
+
+
+# -------------------- Round Trip Check --------------------
+def random_game(rng, plies):
+    """Random legal game, biased towards promotions, castling and en passant"""
+    board = chess.Board()
+    while len(board.move_stack) < plies and not board.is_game_over():
+        moves = list(board.legal_moves)
+        special = [
+            m
+            for m in moves
+            if m.promotion or board.is_castling(m) or board.is_en_passant(m)
+        ]
+        board.push(rng.choice(special if special and rng.random() < 0.7 else moves))
+    return pgn.Game.from_board(board)
+
+
+def roundtrip(n, path, seed=1):
+    """
+    Exports n random games (one from a custom FEN) to a move archive, reads
+    them back and compares every ply with python-chess. Returns the failures.
+    """
+    rng = random.Random(seed)
+    games = [random_game(rng, rng.randint(0, 300)) for _ in range(n)]
+    custom = chess.Board("r3k2r/1P6/8/3pP3/8/8/6p1/R3K2R w KQkq d6 0 1")
+    games.append(pgn.Game.from_board(custom))
+    games[-1].end().add_main_variation(chess.Move.from_uci("e5d6"))
+    records = [
+        GameRecord(f"g{i}", "w", "b", "", 0, 0, zlib.compress(str(g).encode()))
+        for i, g in enumerate(games)
+    ]
+    export_archive(records, path)
+    reader = MoveArchive(path)
+    failures = []
+    try:
+        for i, g in enumerate(games):
+            expected = list(g.mainline_moves())
+            if reader.moves(i) != expected or reader.halfmove_count(i) != len(expected):
+                failures.append((i, "moves"))
+                continue
+            board = g.board()
+            for ply, move in enumerate(expected, start=1):
+                board.push(move)
+                if ply % 17 == 0 or ply == len(expected):
+                    if reader.board_at(i, ply).fen() != board.fen():
+                        failures.append((i, f"ply {ply}"))
+                        break
+    finally:
+        reader.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary move archive tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("roundtrip", help="round-trip random games via python-chess")
+    check.add_argument("--games", type=int, default=500)
+    check.add_argument("--path", default="roundtrip.moves")
+    args = parser.parse_args()
+
+    if args.command == "roundtrip":
+        failures = roundtrip(args.games, args.path)
+        os.remove(args.path)
+        for i, what in failures:
+            print(f"game {i}: {what} mismatch")
+        print(f"{args.games + 1} games, {len(failures)} failures")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
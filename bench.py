@@ -0,0 +1,706 @@
+"""
+Benchmarks for the client.
+
+Usage:
+    python bench.py memory [--sizes 10000 100000]
+    python bench.py wire session.jsonl [...]   (record with chess_client.py --record)
+    python bench.py sweep [--bots ID ...] [--levels 1 5 10] [--csv out.csv] [--json out.json] [--save]
+    python bench.py micro [--save]   (headless: xvfb-run python bench.py micro)
+
+sweep and micro print the change from bench_baseline.json, which holds one
+section per benchmark; --save replaces that benchmark's section.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import zlib
+
+import chess
+import chess.pgn
+
+import archive
+import transport
+
+# Distinct random games used as move sources for synthetic archives
+TEMPLATE_GAMES = 40
+TEMPLATE_PLIES = 80
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json"
+)
+
+
+# -------------------- Baseline --------------------
+def load_baseline(path, section):
+    """Saved results of one benchmark, {} if there are none"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get(section, {}).get("results", {})
+
+
+def save_baseline(path, section, results, **context):
+    """Replaces one benchmark's section, keeping the others"""
+    data = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    data[section] = {
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "saved": time.strftime("%Y-%m-%d %H:%M"),
+        **context,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def change(value, base):
+    """ "+12%" style change from the baseline, "-" without one"""
+    if value is None or not base:
+        return "-"
+    return f"{(value / base - 1) * 100:+.0f}%"
+
+
+# -------------------- Synthetic Data --------------------
+def random_movetext(rng, plies=TEMPLATE_PLIES):
+    """chess.com style movetext with clock comments for a random legal game"""
+    board = chess.Board()
+    parts = []
+    clock = 180.0
+    while len(board.move_stack) < plies and not board.is_game_over():
+        move = rng.choice(list(board.legal_moves))
+        number = board.fullmove_number
+        prefix = f"{number}. " if board.turn == chess.WHITE else f"{number}... "
+        clock -= rng.random() * 3
+        parts.append(
+            f"{prefix}{board.san(move)} {{[%clk 0:{int(clock) // 60:02d}:{clock % 60:04.1f}]}}"
+        )
+        board.push(move)
+    return " ".join(parts), len(board.move_stack)
+
+
+def synthetic_games(n, seed=1):
+    """Yields n annotated server-style game dicts, each with its own PGN string"""
+    rng = random.Random(seed)
+    templates = [random_movetext(rng) for _ in range(TEMPLATE_GAMES)]
+    players = [f"player{i}" for i in range(50)]
+    for i in range(n):
+        movetext, plies = templates[i % len(templates)]
+        white, black = rng.sample(players, 2)
+        uuid = f"{i:08x}-0000-0000-0000-000000000000"
+        pgn_text = (
+            f'[Event "Live Chess"]\n[Site "Chess.com"]\n[White "{white}"]\n'
+            f'[Black "{black}"]\n[Result "1-0"]\n'
+            f'[Link "https://www.chess.com/game/live/{i}"]\n\n{movetext} 1-0\n'
+        )
+        yield {
+            "uuid": uuid,
+            "end_time": 1700000000 + i,
+            "white": {"username": white, "result": "win", "rating": 1500},
+            "black": {"username": black, "result": "resigned", "rating": 1500},
+            "pgn": pgn_text,
+            "time_control": "180",
+            "time_class": "blitz",
+            "rules": "chess",
+            "url": f"https://www.chess.com/game/live/{i}",
+            "display_result": f"{white} won",
+            "halfmove_count": plies,
+        }
+
+
+# -------------------- Memory --------------------
+def retained(build):
+    """Bytes still allocated after build() returns, with its result kept alive"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def bench_memory(sizes):
+    print(
+        f"{'games':>8} {'raw dicts':>12} {'GameRecord':>12} {'ratio':>7} {'decode':>9}"
+    )
+    for n in sizes:
+        raw_bytes, raw = retained(lambda: list(synthetic_games(n)))
+        del raw
+        rec_bytes, records = retained(
+            lambda: [archive.GameRecord.from_game(g) for g in synthetic_games(n)]
+        )
+        t0 = time.perf_counter()
+        for g in records[:1000]:
+            g.pgn
+        decode_us = (time.perf_counter() - t0) / min(n, 1000) * 1e6
+        print(
+            f"{n:>8} {raw_bytes / 2**20:>10.1f}MB {rec_bytes / 2**20:>10.1f}MB "
+            f"{raw_bytes / max(rec_bytes, 1):>6.1f}x {decode_us:>7.1f}us"
+        )
+        del records
+
+
+# -------------------- Wire --------------------
+# (name, window bits, level); None = no compression
+DEFLATE_CONFIGS = [
+    ("off", None, None),
+    ("deflate default", 15, zlib.Z_DEFAULT_COMPRESSION),
+    (
+        f"deflate w{transport.DEFLATE_WINDOW_BITS} l{transport.DEFLATE_LEVEL}",
+        transport.DEFLATE_WINDOW_BITS,
+        transport.DEFLATE_LEVEL,
+    ),
+]
+
+
+def frame_header(size, masked):
+    """WebSocket frame header bytes; client frames carry a 4 byte mask"""
+    length = 2 if size < 126 else 4 if size < 65536 else 10
+    return length + (4 if masked else 0)
+
+
+def deflate_frames(frames, bits, level):
+    """permessage-deflate with context takeover, as sent on one connection"""
+    if bits is None:
+        return list(frames)
+    compressor = zlib.compressobj(
+        level, zlib.DEFLATED, -bits, transport.DEFLATE_MEM_LEVEL
+    )
+    # The empty deflate block that ends each message is not sent
+    return [
+        (compressor.compress(f) + compressor.flush(zlib.Z_SYNC_FLUSH))[:-4]
+        for f in frames
+    ]
+
+
+def decode_cost(frames, bits, text, rounds):
+    """Mean seconds to inflate and decode one received frame"""
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        inflater = zlib.decompressobj(-bits) if bits is not None else None
+        for frame in frames:
+            if inflater is not None:
+                frame = inflater.decompress(frame + b"\x00\x00\xff\xff")
+            transport.decode(frame.decode() if text else frame)
+    return (time.perf_counter() - t0) / max(rounds * len(frames), 1)
+
+
+def bench_wire(paths, rounds):
+    codecs = [transport.JSON_PROTOCOL]
+    if transport.msgpack is not None:
+        codecs.append(transport.MSGPACK_PROTOCOL)
+    else:
+        print("msgpack not installed, JSON only")
+
+    records = [r for path in paths for r in transport.load_session(path)]
+    incoming = [r["payload"] for r in records if r["dir"] == "in"]
+    outgoing = [r["payload"] for r in records if r["dir"] == "out"]
+    print(
+        f"{len(incoming)} frames in, {len(outgoing)} out, from {len(paths)} session(s)"
+    )
+    print(
+        f"{'encoding':<9} {'compression':<16} {'in':>10} {'out':>9} "
+        f"{'vs json':>8} {'decode/frame':>13}"
+    )
+
+    baseline = None
+    for codec in codecs:
+        text = codec == transport.JSON_PROTOCOL
+        # Text frames go out as UTF-8
+        raw_in = [transport.encode(p, codec) for p in incoming]
+        raw_out = [transport.encode(p, codec) for p in outgoing]
+        if text:
+            raw_in = [f.encode() for f in raw_in]
+            raw_out = [f.encode() for f in raw_out]
+        for name, bits, level in DEFLATE_CONFIGS:
+            wire_in = deflate_frames(raw_in, bits, level)
+            wire_out = deflate_frames(raw_out, bits, level)
+            bytes_in = sum(len(f) + frame_header(len(f), False) for f in wire_in)
+            bytes_out = sum(len(f) + frame_header(len(f), True) for f in wire_out)
+            cost = decode_cost(wire_in, bits, text, rounds)
+            total = bytes_in + bytes_out
+            baseline = baseline or total
+            print(
+                f"{codec.split('.')[-1]:<9} {name:<16} {bytes_in:>10} {bytes_out:>9} "
+                f"{total / baseline:>7.2f}x {cost * 1e6:>11.1f}us"
+            )
+
+
+# -------------------- Sweep --------------------
+SWEEP_URL = "ws://127.0.0.1:8000/ws"
+SWEEP_LEVELS = [1, 5, 10, 15, 20, 25]
+
+# Test suite: (name, start FEN, moves in SAN). The last move is the
+# opponent's; the bot's reply to it is what gets timed.
+SWEEP_POSITIONS = [
+    ("opening-e4", chess.STARTING_FEN, "e4"),
+    ("sicilian", chess.STARTING_FEN, "e4 c5 Nf3 d6 d4"),
+    ("qgd", chess.STARTING_FEN, "d4 d5 c4 e6 Nc3 Nf6 Bg5"),
+    ("italian", chess.STARTING_FEN, "e4 e5 Nf3 Nc6 Bc4 Bc5 c3"),
+    ("scholar-defence", chess.STARTING_FEN, "e4 e5 Bc4 Nc6 Qh5"),
+    (
+        "ruy-closed",
+        chess.STARTING_FEN,
+        "e4 e5 Nf3 Nc6 Bb5 a6 Ba4 Nf6 O-O Be7 Re1 b5 Bb3 d6 c3 O-O h3",
+    ),
+    (
+        "kings-indian",
+        chess.STARTING_FEN,
+        "d4 Nf6 c4 g6 Nc3 Bg7 e4 d6 Nf3 O-O Be2 e5 O-O Nc6 d5",
+    ),
+    (
+        "kiwipete",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "O-O",
+    ),
+    ("lucena", "1K1k4/1P6/8/8/8/8/r7/2R5 w - - 0 1", "Rd1+"),
+    ("pawn-ending", "8/8/8/3k4/8/3K4/3P4/8 w - - 0 1", "Ke3"),
+    ("queen-ending", "8/6k1/8/8/8/8/1q3PK1/4Q3 w - - 0 1", "Qe5+"),
+]
+
+
+def sweep_positions():
+    """(name, FEN before the opponent's move, that move in UCI) per position"""
+    for name, fen, line in SWEEP_POSITIONS:
+        board = chess.Board(fen)
+        for san in line.split():
+            board.push_san(san)
+        move = board.pop()
+        yield name, board.fen(), move.uci()
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+async def recv_until(ws, msg_type, timeout):
+    while True:
+        data = transport.decode(await asyncio.wait_for(ws.recv(), timeout))
+        if data.get("error"):
+            raise RuntimeError(data["error"])
+        if data.get("type") == msg_type:
+            return data
+
+
+async def sweep_bot_level(url, bot_id, level, positions, repeats, timeout):
+    """
+    Asks one bot at one level for its reply in every test position over one
+    connection, the same exchange the client makes (init, select_bot,
+    next_move). Latency is from sending next_move to the engine_move frame.
+    """
+    samples = []
+    ws = await transport.connect(url)
+    try:
+        codec = transport.codec_for(ws)
+        for repeat in range(repeats):
+            for name, fen, move in positions:
+                sample = {
+                    "bot": bot_id,
+                    "level": level,
+                    "position": name,
+                    "repeat": repeat,
+                    "move": None,
+                    "latency_s": None,
+                    "error": "",
+                }
+                try:
+                    await ws.send(
+                        transport.encode(
+                            {"action": "init", "fen": fen, "moves": []}, codec
+                        )
+                    )
+                    await recv_until(ws, "init", timeout)
+                    await ws.send(
+                        transport.encode(
+                            {
+                                "action": "select_bot",
+                                "bot_id": bot_id,
+                                "engine_level": level,
+                            },
+                            codec,
+                        )
+                    )
+                    t0 = time.perf_counter()
+                    await ws.send(
+                        transport.encode(
+                            {"action": "next_move", "opponent_move": move}, codec
+                        )
+                    )
+                    data = await recv_until(ws, "engine_move", timeout)
+                    sample["latency_s"] = round(time.perf_counter() - t0, 4)
+                    sample["move"] = f"{data['move']['from']}{data['move']['to']}"
+                except (RuntimeError, asyncio.TimeoutError) as e:
+                    sample["error"] = str(e) or type(e).__name__
+                    if isinstance(e, asyncio.TimeoutError):
+                        # The reply may still come; start over on a new socket
+                        await ws.close()
+                        ws = await transport.connect(url)
+                samples.append(sample)
+    finally:
+        await ws.close()
+    return samples
+
+
+async def server_bots(url, timeout):
+    """Bot ids the server lists in its init reply"""
+    async with transport.connect(url) as ws:
+        codec = transport.codec_for(ws)
+        await ws.send(transport.encode({"action": "init", "side": "black"}, codec))
+        data = await recv_until(ws, "init", timeout)
+    return [bot.get("id") or bot.get("name") for bot in data.get("bots", [])]
+
+
+def summarize_sweep(samples):
+    """
+    One row per (bot, level): latency percentiles and how often its move
+    matches the same bot at the highest level swept (the reference)
+    """
+    first = {}  # (bot, level, position) -> first move returned
+    for s in samples:
+        if s["move"]:
+            first.setdefault((s["bot"], s["level"], s["position"]), s["move"])
+    top = {}
+    for bot, level, _ in first:
+        top[bot] = max(level, top.get(bot, level))
+    rows = []
+    for bot, level in sorted({(s["bot"], s["level"]) for s in samples}):
+        runs = [s for s in samples if s["bot"] == bot and s["level"] == level]
+        latencies = [s["latency_s"] for s in runs if s["latency_s"] is not None]
+        compared = agreed = 0
+        for (b, lv, position), move in first.items():
+            ref = first.get((bot, top.get(bot), position))
+            if b == bot and lv == level and ref:
+                compared += 1
+                agreed += move == ref
+        row = {
+            "bot": bot,
+            "level": level,
+            "samples": len(runs),
+            "errors": sum(1 for s in runs if s["error"]),
+            "p50_s": None,
+            "p90_s": None,
+            "max_s": None,
+            "mean_s": None,
+            "agreement": round(agreed / compared, 3) if compared else None,
+            "reference_level": top.get(bot),
+        }
+        if latencies:
+            row.update(
+                p50_s=percentile(latencies, 50),
+                p90_s=percentile(latencies, 90),
+                max_s=max(latencies),
+                mean_s=round(statistics.mean(latencies), 4),
+            )
+        rows.append(row)
+    return rows
+
+
+def bench_sweep(args):
+    positions = list(sweep_positions())
+    bots = args.bots or asyncio.run(server_bots(args.url, args.timeout))
+    if not bots:
+        print("The server listed no bots; pass --bots")
+        return
+    print(
+        f"{len(bots)} bot(s) x {len(args.levels)} level(s) x "
+        f"{len(positions)} positions x {args.repeats} repeat(s) against {args.url}"
+    )
+    samples = []
+    for bot_id in bots:
+        for level in args.levels:
+            samples += asyncio.run(
+                sweep_bot_level(
+                    args.url, bot_id, level, positions, args.repeats, args.timeout
+                )
+            )
+
+    def fmt(value):
+        return f"{value:.3f}" if value is not None else "-"
+
+    rows = summarize_sweep(samples)
+    baseline = {} if args.save else load_baseline(args.baseline, "sweep")
+    print(
+        f"{'bot':<20} {'level':>5} {'p50 s':>8} {'p90 s':>8} {'max s':>8} "
+        f"{'errors':>6} {'agree':>6} {'p50 vs base':>11} {'p90 vs base':>11}"
+    )
+    for row in rows:
+        agree = (
+            f"{row['agreement'] * 100:.0f}%" if row["agreement"] is not None else "-"
+        )
+        base = baseline.get(f"{row['bot']}@{row['level']}", {})
+        print(
+            f"{row['bot']:<20} {row['level']:>5} {fmt(row['p50_s']):>8} "
+            f"{fmt(row['p90_s']):>8} {fmt(row['max_s']):>8} "
+            f"{row['errors']:>6} {agree:>6} "
+            f"{change(row['p50_s'], base.get('p50_s')):>11} "
+            f"{change(row['p90_s'], base.get('p90_s')):>11}"
+        )
+    print("agree: same move as the bot's highest level swept")
+    if args.save:
+        results = {
+            f"{row['bot']}@{row['level']}": {
+                k: row[k] for k in ("p50_s", "p90_s", "mean_s", "agreement")
+            }
+            for row in rows
+        }
+        save_baseline(
+            args.baseline, "sweep", results, url=args.url, repeats=args.repeats
+        )
+        print(f"Baseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"No sweep baseline at {args.baseline}; record one with --save")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(samples[0]))
+            writer.writeheader()
+            writer.writerows(samples)
+        print(f"Samples written to {args.csv}")
+    if args.json:
+        report = {
+            "url": args.url,
+            "levels": args.levels,
+            "repeats": args.repeats,
+            "positions": [
+                {"name": name, "fen": fen, "opponent_move": move}
+                for name, fen, move in positions
+            ],
+            "summary": rows,
+            "samples": samples,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+
+# -------------------- Micro --------------------
+# Slower than the baseline by more than this fraction counts as a regression
+REGRESSION_TOLERANCE = 0.25
+LONG_GAME_PLIES = 300
+
+
+def long_game(plies=LONG_GAME_PLIES, seed=1):
+    """A random legal game of exactly `plies` plies"""
+    rng = random.Random(seed)
+    while True:
+        board = chess.Board()
+        while len(board.move_stack) < plies and not board.is_game_over():
+            board.push(rng.choice(list(board.legal_moves)))
+        if len(board.move_stack) == plies:
+            return board
+
+
+def burst_trace(board, lines=3, depths=20):
+    """
+    Frames a server sends while answering each move of `board`: multipv
+    analysis for every depth, then the engine_move with the full state
+    """
+    import chess_client
+
+    frames = []
+    replay = chess.Board()
+    for move in board.move_stack:
+        for depth in range(1, depths + 1):
+            for index in range(1, lines + 1):
+                frames.append(
+                    {
+                        "type": "analysis",
+                        "depth": depth,
+                        "multipv": index,
+                        "score": {"cp": 34 - index * 11},
+                        "pv": [move.uci()] * min(depth, 8),
+                    }
+                )
+        replay.push(move)
+        frames.append(
+            {
+                "type": "engine_move",
+                "move": {
+                    "from": chess.square_name(move.from_square),
+                    "to": chess.square_name(move.to_square),
+                },
+                "state": chess_client.state_from_board(replay),
+                "status": "Stand-in suggests " + move.uci(),
+            }
+        )
+    return frames
+
+
+def timed(fn, ops, repeats):
+    """Best of `repeats` runs of fn(), in microseconds per op"""
+    best = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - t0) / ops * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def micro_cases(games, repeats):
+    """(name, unit, us per unit) for every hot path that can run here"""
+    import chess_client
+
+    board = long_game()
+    replay = chess.Board()
+    boards = []
+    for move in board.move_stack:
+        replay.push(move)
+        boards.append(replay.copy(stack=False))
+    states = [chess_client.state_from_board(b) for b in boards]
+    raw_games = list(synthetic_games(games))
+
+    yield "state_from_board", "position", timed(
+        lambda: [chess_client.state_from_board(b) for b in boards],
+        len(boards),
+        repeats,
+    )
+
+    def record_history():
+        live = chess.Board()
+        history = chess_client.GameHistory(live)
+        for move in board.move_stack:
+            live.push(move)
+            history.sync(live)
+
+    yield "history_sync", "ply", timed(record_history, len(board.move_stack), repeats)
+
+    yield "annotate_game", "game", timed(
+        lambda: [archive.make_record(dict(g)) for g in raw_games],
+        len(raw_games),
+        max(1, repeats // 2),
+    )
+
+    frames = burst_trace(board)
+    for codec in [transport.JSON_PROTOCOL, transport.MSGPACK_PROTOCOL]:
+        if codec == transport.MSGPACK_PROTOCOL and transport.msgpack is None:
+            continue
+        encoded = [transport.encode(f, codec) for f in frames]
+        yield f"decode_{codec.split('.')[-1]}", "frame", timed(
+            lambda: [transport.decode(f) for f in encoded], len(encoded), repeats
+        )
+
+    # Tk cases need a display (headless: xvfb-run python bench.py micro)
+    try:
+        root = chess_client.tk.Tk()
+    except chess_client.tk.TclError:
+        print("No display: skipping update_board and treeview_populate")
+        return
+    root.withdraw()
+    try:
+        frame = chess_client.ChessBoard(root, None)
+        frame.pack()
+
+        def repaint():
+            for i, state in enumerate(states):
+                frame.update_board(state, "e2e4" if i % 2 else None)
+                root.update_idletasks()
+
+        yield "update_board", "repaint", timed(repaint, len(states), repeats)
+
+        records = [archive.GameRecord.from_game(g) for g in raw_games]
+
+        def populate():
+            tree = chess_client.ttk.Treeview(root, columns=("game", "result"))
+            chess_client.insert_game_rows(tree, records, {})
+            root.update_idletasks()
+            tree.destroy()
+
+        yield "treeview_populate", "row", timed(populate, len(records), repeats)
+    finally:
+        root.destroy()
+
+
+def bench_micro(args):
+    baseline = {} if args.save else load_baseline(args.baseline, "micro")
+    print(f"{'case':<20} {'us/op':>10} {'per':<9} {'baseline':>10} {'change':>7}")
+    results = {}
+    regressions = []
+    for name, unit, us in micro_cases(args.games, args.repeats):
+        results[name] = us
+        base = baseline.get(name)
+        ratio = us / base if base else None
+        flag = ""
+        if ratio is not None and ratio > 1 + args.tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<20} {us:>10.2f} {unit:<9} "
+            f"{f'{base:.2f}' if base else '-':>10} {change(us, base):>7}{flag}"
+        )
+    if args.save:
+        save_baseline(args.baseline, "micro", results, games=args.games)
+        print(f"Baseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"No baseline at {args.baseline}; record one with --save")
+    if regressions:
+        print(
+            f"Slower than baseline by over {args.tolerance:.0%}: {', '.join(regressions)}"
+        )
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    memory = sub.add_parser("memory", help="game list memory at archive scale")
+    memory.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+
+    wire = sub.add_parser("wire", help="bytes on the wire and decode cost per frame")
+    wire.add_argument("sessions", nargs="+", help="recorded session files")
+    wire.add_argument("--rounds", type=int, default=20)
+
+    sweep = sub.add_parser(
+        "sweep", help="suggestion latency and agreement across bots and levels"
+    )
+    sweep.add_argument("--url", default=SWEEP_URL, help="game server websocket")
+    sweep.add_argument("--bots", nargs="+", help="bot ids (default: all listed)")
+    sweep.add_argument("--levels", type=int, nargs="+", default=SWEEP_LEVELS)
+    sweep.add_argument("--repeats", type=int, default=3)
+    sweep.add_argument("--timeout", type=float, default=60, help="seconds per reply")
+    sweep.add_argument("--csv", help="write every sample to this CSV file")
+    sweep.add_argument("--json", help="write summary and samples to this JSON file")
+    sweep.add_argument("--baseline", default=BASELINE_PATH)
+    sweep.add_argument(
+        "--save", action="store_true", help="record these results as the baseline"
+    )
+
+    micro = sub.add_parser(
+        "micro", help="per-call cost of the client's hot paths vs a baseline"
+    )
+    micro.add_argument("--games", type=int, default=10000, help="archive size")
+    micro.add_argument("--repeats", type=int, default=5)
+    micro.add_argument("--baseline", default=BASELINE_PATH)
+    micro.add_argument(
+        "--save", action="store_true", help="record these results as the baseline"
+    )
+    micro.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+
+    args = parser.parse_args()
+    if args.command == "memory":
+        bench_memory(args.sizes)
+    elif args.command == "wire":
+        bench_wire(args.sessions, args.rounds)
+    elif args.command == "sweep":
+        bench_sweep(args)
+    elif args.command == "micro":
+        bench_micro(args)
+
+
+if __name__ == "__main__":
+    main()
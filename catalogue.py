@@ -0,0 +1,153 @@
+"""
+Local bot catalogue, so the bot selector works before the game socket is up.
+
+The catalogue (ids, names, ratings, avatar hashes) is kept in the cache
+directory with the version and ETag the server last sent. It is loaded from
+disk at startup and refreshed in the background with a conditional request
+that only asks for changes:
+
+    GET /api/chess/bots?since=<version>        If-None-Match: <etag>
+    304                                        nothing changed
+    200 {"version": v, "bots": [...], "removed": [ids], "full": false}
+    200 [...]                                  full list (no delta support)
+
+The bots array of every init frame is merged in as well, so the catalogue
+stays current even against servers without the endpoint. Avatars are
+cached by hash next to the catalogue and downloaded again only when the
+hash changes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+# Bumped whenever the file layout changes; older files are ignored
+CATALOGUE_VERSION = 1
+
+
+def bot_id(bot):
+    return bot.get("id") or bot.get("name")
+
+
+def avatar_hash(bot):
+    """The server's avatar hash, or one derived from the avatar URL"""
+    if bot.get("avatar_hash"):
+        return bot["avatar_hash"]
+    if bot.get("avatar"):
+        return hashlib.sha1(bot["avatar"].encode()).hexdigest()[:16]
+    return ""
+
+
+class BotCatalogue:
+    """
+    Bots by id in server order, plus the last selection (bot ids and engine
+    level) so the selector can pre-select it next time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.avatar_dir = os.path.join(os.path.dirname(path), "avatars")
+        self.bots = {}
+        self.version = None  # server catalogue version of the last refresh
+        self.etag = None
+        self.selected = []
+        self.engine_level = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("layout") != CATALOGUE_VERSION:
+            return self
+        self.bots = {bot_id(b): b for b in data.get("bots", [])}
+        self.version = data.get("version")
+        self.etag = data.get("etag")
+        self.selected = data.get("selected", [])
+        self.engine_level = data.get("engine_level")
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with self.lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "layout": CATALOGUE_VERSION,
+                    "version": self.version,
+                    "etag": self.etag,
+                    "selected": self.selected,
+                    "engine_level": self.engine_level,
+                    "bots": list(self.bots.values()),
+                },
+                f,
+            )
+        os.replace(tmp, self.path)
+
+    def list(self):
+        with self.lock:
+            return list(self.bots.values())
+
+    def merge(self, bots, removed=(), full=False):
+        """Applies a full list or a delta; returns True if anything changed"""
+        with self.lock:
+            merged = {} if full else dict(self.bots)
+            for bid in removed:
+                merged.pop(bid, None)
+            for bot in bots:
+                bot = dict(bot, avatar_hash=avatar_hash(bot))
+                merged[bot_id(bot)] = bot
+            changed = merged != self.bots
+            self.bots = merged
+        return changed
+
+    def refresh(self, api_url, http):
+        """Asks the server for changes since the stored version"""
+        headers = {"If-None-Match": self.etag} if self.etag else {}
+        params = {"since": self.version} if self.version is not None else {}
+        resp = http.get(
+            f"{api_url}/api/chess/bots", params=params, headers=headers, timeout=5
+        )
+        if resp.status_code == 304:
+            return False
+        resp.raise_for_status()
+        data = resp.json()
+        if isinstance(data, list):
+            changed = self.merge(data, full=True)
+        else:
+            changed = self.merge(
+                data.get("bots", []),
+                data.get("removed", []),
+                full=data.get("full", self.version is None),
+            )
+            changed |= data.get("version", self.version) != self.version
+            self.version = data.get("version", self.version)
+        self.etag = resp.headers.get("ETag", self.etag)
+        return changed
+
+    def remember_selection(self, bot_ids, engine_level):
+        self.selected = list(bot_ids)
+        self.engine_level = engine_level
+
+    # -------------------- Avatars --------------------
+    def avatar(self, bot, http):
+        """Avatar image bytes, from the cache when the hash is unchanged"""
+        digest = avatar_hash(bot)
+        if not digest:
+            return None
+        path = os.path.join(self.avatar_dir, digest)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+        resp = http.get(bot["avatar"], timeout=2)
+        resp.raise_for_status()
+        os.makedirs(self.avatar_dir, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(resp.content)
+        os.replace(path + ".tmp", path)
+        return resp.content
@@ -1,19 +1,57 @@
+import time
+
+STARTUP_T0 = time.perf_counter()
+
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 import threading
-import asyncio
-import websockets
-import requests
-import keyboard
-import time
-import json
+import importlib
+import os
+import subprocess
+import sys
 import traceback
-import chess
 import io
-from chess import pgn
 
-API_URL = "http://127.0.0.1:8000"
-WS_URL = f"{API_URL.replace('http', 'ws')}/ws"
+from config import API_URL, CACHE_DIR, WS_URL, log_exception, log_info
+
+# Polyglot book probed during live play (build with `python openings.py book`)
+BOOK_PATH = os.path.join(CACHE_DIR, "book.bin")
+# Bot catalogue kept between sessions (see catalogue.py)
+BOTS_PATH = os.path.join(CACHE_DIR, "bots.json")
+# Game list board thumbnails (see thumbnails.py), and how long scrolling
+# has to settle before the rows in view are rendered
+THUMBS_DIR = os.path.join(CACHE_DIR, "thumbs")
+THUMB_PREFETCH_MS = 120
+# Game list rows inserted per Tk tick while a large archive loads
+GAME_ROWS_PER_TICK = 200
+# Local UCI engine used to ponder the opponent's likely replies (off if unset)
+PONDER_ENGINE = os.environ.get("CHESS_PONDER_ENGINE")
+
+# Warm-up: delay after the window is up, and the health check endpoint
+WARMUP_DELAY_MS = 100
+PING_URL = f"{API_URL}/ping"
+HTTP_POOL_SIZE = 8
+
+# Websocket server for the multi-bot shadow sessions (fan-out is off if
+# unset). Each shadow session replays the game there (init, select_bot,
+# next_move) on every move, so only point this at a server that keeps its
+# sessions apart from the live game, e.g. the local stand-in server
+FANOUT_URL = os.environ.get("CHESS_FANOUT_URL")
+
+# Run the game socket and pondering in a child process (see worker.py)
+WORKER_PROCESS = os.environ.get("CHESS_CLIENT_WORKER") == "1"
+# How often the Tk loop reads the worker's board block and events (ms)
+WORKER_POLL_MS = 16
+
+# Cold start to interactive target (seconds)
+STARTUP_BUDGET = 0.6
+
+# UI dispatch queue drain interval (ms), about one frame
+UI_FRAME_MS = 16
+
+# Tk loop stall detection (seconds)
+WATCHDOG_INTERVAL = 0.1
+WATCHDOG_THRESHOLD = 0.25
 
 PIECES = {
     "wK": "♔",
@@ -31,18 +69,612 @@ PIECES = {
 }
 
 
-def log_exception(e):
-    with open("error.log", "a") as f:
-        f.write(f"{time.ctime()}\n")
-        f.write(traceback.format_exc())
-        f.write("\n\n")
+# -------------------- Lazy Imports --------------------
+IMPORT_TIMES = {}
+
+
+class LazyModule:
+    """
+    Stand-in for a heavy module that is only imported on first attribute access.
+    The time spent importing is recorded in IMPORT_TIMES for the startup report.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            t0 = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            IMPORT_TIMES[self._name] = time.perf_counter() - t0
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+asyncio = LazyModule("asyncio")
+websockets = LazyModule("websockets")
+requests = LazyModule("requests")
+keyboard = LazyModule("keyboard")
+chess = LazyModule("chess")
+pgn = LazyModule("chess.pgn")
+polyglot = LazyModule("chess.polyglot")
+archive = LazyModule("archive")
+openings = LazyModule("openings")
+transport = LazyModule("transport")
+worker = LazyModule("worker")
+catalogue = LazyModule("catalogue")
+thumbnails = LazyModule("thumbnails")
+ponder = LazyModule("ponder")
+
+
+# -------------------- Startup Report --------------------
+def import_time_report(top=12):
+    """
+    Runs a fresh interpreter with `-X importtime` and returns the slowest
+    imports triggered by loading this module as (cumulative_us, self_us, name).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import chess_client"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+        except ValueError:
+            continue
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def startup_report(interactive_s, budget=STARTUP_BUDGET):
+    lines = [
+        f"Cold start to interactive: {interactive_s * 1000:.0f} ms "
+        f"(budget {budget * 1000:.0f} ms) {'OK' if interactive_s <= budget else 'OVER BUDGET'}",
+        "",
+        "Slowest imports at load (-X importtime):",
+        f"{'cumulative':>12} {'self':>10}  module",
+    ]
+    for cumulative_us, self_us, name in import_time_report():
+        lines.append(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms {name}")
+    lines.append("")
+    lines.append("Deferred imports resolved so far:")
+    for name, seconds in sorted(IMPORT_TIMES.items(), key=lambda kv: -kv[1]):
+        lines.append(f"{seconds * 1000:>10.1f}ms  {name}")
+    if not IMPORT_TIMES:
+        lines.append("  (none)")
+    return "\n".join(lines)
+
+
+# -------------------- Board Mirror --------------------
+def state_from_board(bd):
+    state = {}
+    for sq in chess.SQUARES:
+        p = bd.piece_at(sq)
+        if p:
+            color = "w" if p.color else "b"
+            state[chess.SQUARE_NAMES[sq]] = f"{color}{p.symbol().upper()}"
+    return state
+
+
+def placement_from_state(state):
+    """board_fen() of a server state dict"""
+    board = chess.Board(None)
+    for sq, code in (state or {}).items():
+        color = chess.WHITE if code[0] == "w" else chess.BLACK
+        piece_type = chess.PIECE_SYMBOLS.index(code[1].lower())
+        board.set_piece_at(chess.parse_square(sq), chess.Piece(piece_type, color))
+    return board.board_fen()
+
+
+def board_from_state(state, turn):
+    """
+    Best-effort board for a server state with no history: castling rights
+    are inferred from kings and rooks on their home squares.
+    """
+    board = chess.Board(None)
+    board.set_board_fen(placement_from_state(state))
+    board.turn = turn
+    board.castling_rights = _home_castling(board)
+    return board
+
+
+def _home_castling(board):
+    rights = 0
+    for color, rank in ((chess.WHITE, 0), (chess.BLACK, 7)):
+        if board.piece_at(chess.square(4, rank)) != chess.Piece(chess.KING, color):
+            continue
+        for rook_file in (0, 7):
+            rook_sq = chess.square(rook_file, rank)
+            if board.piece_at(rook_sq) == chess.Piece(chess.ROOK, color):
+                rights |= chess.BB_SQUARES[rook_sq]
+    return rights
+
+
+def move_from_squares(board, f, t, legal=True, promotion=None):
+    """
+    The move from f to t in `board`, or None. When several match, the
+    promotion to `promotion` (a piece symbol, e.g. "n") or else to a queen.
+    """
+    from_sq, to_sq = chess.parse_square(f), chess.parse_square(t)
+    moves = board.legal_moves if legal else board.pseudo_legal_moves
+    wanted = chess.Piece.from_symbol(promotion).piece_type if promotion else None
+    found = None
+    for move in moves:
+        if move.from_square == from_sq and move.to_square == to_sq:
+            if move.promotion in (None, wanted or chess.QUEEN):
+                return move
+            found = move
+    return found
+
+
+def resolve_typed_move(board, text):
+    """
+    Parses typed input as UCI (e2e4, e7e8q) or SAN (Nf3, exd5, O-O, 0-0)
+    in `board`. Raises ValueError with a short reason when it cannot.
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("empty move")
+    try:
+        move = chess.Move.from_uci(text.lower())
+        if move in board.legal_moves:
+            return move
+    except ValueError:
+        pass
+    try:
+        move = board.parse_san(text)
+    except chess.AmbiguousMoveError:
+        raise ValueError(f"{text} is ambiguous, add the file or rank")
+    except ValueError:
+        raise ValueError(f"{text} is not a legal move")
+    if not move:
+        # parse_san takes "--", "0000" and "Z0" as a null move
+        raise ValueError(f"{text} is not a legal move")
+    return move
+
+
+def sync_board(board, state, max_plies=2, max_rewind=4, undo=False):
+    """
+    Advances `board` (a copy) by up to max_plies legal moves until it matches
+    the server state, keeping the move history. Returns None if no match.
+    - A placement seen earlier in the game is a new move reaching it again
+      (e.g. knights back home), so moves are only taken back for an undo
+    - undo: the state answers an undo; up to max_rewind of the board's own
+      moves are taken back, before any forward search
+    """
+    target = placement_from_state(state)
+    if board.board_fen() == target:
+        return board.copy()
+    if undo:
+        rewound = board.copy()
+        for _ in range(min(max_rewind, len(rewound.move_stack))):
+            rewound.pop()
+            if rewound.board_fen() == target:
+                return rewound
+    frontier = [board.copy()]
+    for _ in range(max_plies):
+        next_frontier = []
+        for bd in frontier:
+            for move in bd.legal_moves:
+                bd.push(move)
+                if bd.board_fen() == target:
+                    return bd.copy()
+                next_frontier.append(bd.copy())
+                bd.pop()
+        frontier = next_frontier
+    return None
+
+
+def fen_init(board):
+    """
+    Compact init for `board`: the position after its last irreversible move
+    (capture, pawn move or castling-rights change) plus the moves since,
+    which is all the history repetition rules need. Returns None if replaying
+    them does not reproduce the position and its repetition counts exactly.
+    """
+    replay = board.root()
+    base_fen = replay.fen()
+    base_index = 0
+    for i, move in enumerate(board.move_stack):
+        rights = replay.castling_rights
+        replay.push(move)
+        if replay.halfmove_clock == 0 or replay.castling_rights != rights:
+            base_index = i + 1
+            base_fen = replay.fen()
+    tail = board.move_stack[base_index:]
+    rebuilt = chess.Board(base_fen)
+    for move in tail:
+        rebuilt.push(move)
+    if rebuilt.fen() != board.fen() or any(
+        rebuilt.is_repetition(n) != board.is_repetition(n) for n in (2, 3)
+    ):
+        return None
+    return {"fen": base_fen, "moves": [move.uci() for move in tail]}
+
+
+def format_score(score):
+    """{"cp": 34} -> "+0.34", {"mate": -3} -> "#-3" """
+    if "mate" in score:
+        return f"#{score['mate']}"
+    return f"{score.get('cp', 0) / 100:+.2f}"
+
+
+# -------------------- Game History --------------------
+class GameHistory:
+    """
+    Every confirmed ply of the live game with the position after it, for
+    scrubbing without the server and for the PGN export at game end.
+    - sync() appends each new ply in O(1): one move and one FEN string
+    - plies taken back by an undo are kept and exported as side lines
+    - suggestion notes are attached to the ply they were made for
+    """
+
+    def __init__(self, board):
+        self.start_fen = board.root().fen()
+        self.moves = []  # chess.Move per ply
+        self.fens = []  # FEN after each ply
+        self.notes = {}  # ply index -> suggestion comment
+        self.undone = []  # (ply the line branched at, moves, notes)
+        self.started = time.strftime("%Y.%m.%d")
+        self.file_id = time.strftime("%Y%m%d-%H%M%S")
+        self.extend(board.move_stack)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def position(self, ply):
+        """Board after `ply` plies (0 = the start position)"""
+        return chess.Board(self.fens[ply - 1] if ply else self.start_fen)
+
+    def extend(self, moves):
+        board = self.position(len(self.moves))
+        for move in moves:
+            board.push(move)
+            self.moves.append(move)
+            self.fens.append(board.fen())
+
+    def sync(self, board, max_rewind=8):
+        """
+        Brings the history in line with a confirmed board. Returns False if
+        the board does not continue this game (e.g. it was rebuilt from a
+        bare server state), so the caller can start a new history.
+        """
+        if board.root().fen() != self.start_fen:
+            return False
+        stack = board.move_stack
+        common = min(len(self.moves), len(stack))
+        floor = max(0, common - max_rewind)
+        while common > floor and self.moves[common - 1] != stack[common - 1]:
+            common -= 1
+        if common == floor and floor and self.moves[floor - 1] != stack[floor - 1]:
+            return False
+        if common < len(self.moves):
+            self.undone.append(
+                (
+                    common,
+                    self.moves[common:],
+                    [self.notes.pop(p, "") for p in range(common, len(self.moves))],
+                )
+            )
+            del self.moves[common:]
+            del self.fens[common:]
+        self.extend(stack[common:])
+        return True
+
+    def annotate(self, note, ply=None):
+        if self.moves:
+            self.notes[len(self.moves) - 1 if ply is None else ply] = note
+
+    def describe(self, ply):
+        """ "12. Nf3 {note}" for the ply'th move"""
+        if ply == 0:
+            return "Start position"
+        board = self.position(ply - 1)
+        number = f"{board.fullmove_number}{'.' if board.turn else '...'}"
+        text = f"{number} {board.san(self.moves[ply - 1])}"
+        note = self.notes.get(ply - 1)
+        return f"{text}  ({note})" if note else text
+
+    def to_pgn(self, headers=None):
+        board = chess.Board(self.start_fen)
+        game = pgn.Game()
+        if self.start_fen != chess.STARTING_FEN:
+            game.setup(board)
+        game.headers["Date"] = self.started
+        game.headers.update(headers or {})
+        branches = {}  # ply -> {moves: notes}, repeated undos counted once
+        for ply, moves, notes in self.undone:
+            # Moves played again after the undo stay on the mainline only;
+            # the side line starts where the two differ
+            shared = 0
+            while (
+                shared < len(moves)
+                and ply + shared < len(self.moves)
+                and moves[shared] == self.moves[ply + shared]
+            ):
+                shared += 1
+            if shared < len(moves):
+                branches.setdefault(ply + shared, {}).setdefault(
+                    tuple(moves[shared:]), notes[shared:]
+                )
+        node = game
+        for ply in range(len(self.moves) + 1):
+            mainline = None
+            if ply < len(self.moves):
+                # The mainline goes first: it is the node's first variation
+                mainline = node.add_variation(
+                    self.moves[ply], comment=self.notes.get(ply, "")
+                )
+            for moves, notes in branches.get(ply, {}).items():
+                branch = node
+                for move, note in zip(moves, notes):
+                    branch = branch.add_variation(move, comment=note)
+                node.variations[-1].starting_comment = "undone"
+            node = mainline
+        game.headers["Result"] = self.position(len(self.moves)).result()
+        return str(game)
+
+
+# -------------------- UI Dispatch --------------------
+class UIDispatcher:
+    """
+    Widget updates from other threads go through here and run on the Tk loop,
+    drained once per frame.
+    - post(key, fn, *args): a pending update with the same key is replaced,
+      so a burst of board states ends in one repaint (latest wins)
+    - key None: never coalesced, for one-off actions such as dialogs
+    - depth, max_depth, dropped and ran are kept for the report
+    """
+
+    def __init__(self, root, interval_ms=UI_FRAME_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.serial = 0
+        self.max_depth = 0
+        self.dropped = 0
+        self.ran = 0
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self.root.after(self.interval_ms, self.drain)
+
+    def stop(self):
+        self.running = False
+
+    def post(self, key, fn, *args):
+        with self.lock:
+            if key is None:
+                self.serial += 1
+                key = ("once", self.serial)
+            elif key in self.pending:
+                self.dropped += 1
+            # Replacing keeps the key's place in the queue
+            self.pending[key] = (fn, args)
+            self.max_depth = max(self.max_depth, len(self.pending))
+
+    @property
+    def depth(self):
+        return len(self.pending)
+
+    def drain(self):
+        with self.lock:
+            batch, self.pending = self.pending, {}
+        for fn, args in batch.values():
+            try:
+                fn(*args)
+            except Exception as e:
+                log_exception(e)
+        self.ran += len(batch)
+        if self.running:
+            self.root.after(self.interval_ms, self.drain)
+
+    def report(self):
+        return (
+            f"UI queue: {self.ran} updates run, {self.dropped} coalesced away, "
+            f"max depth {self.max_depth}"
+        )
+
+
+# -------------------- Loop Watchdog --------------------
+class LoopWatchdog:
+    """
+    Detects stalls of the Tk main loop.
+    - A heartbeat is posted with root.after every `interval` seconds
+    - A monitor thread measures how long ago the last heartbeat ran
+    - When the lag exceeds `threshold`, the main thread's stack is logged
+      straight away (a loop that never recovers still gets reported), and
+      the total duration once the loop beats again
+    """
+
+    def __init__(self, root, interval=WATCHDOG_INTERVAL, threshold=WATCHDOG_THRESHOLD):
+        self.root = root
+        self.interval = interval
+        self.threshold = threshold
+        self.main_ident = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        self.running = False
+        self.stalls = 0
+
+    def start(self):
+        self.running = True
+        self.last_beat = time.monotonic()
+        self.root.after(int(self.interval * 1000), self.heartbeat)
+        threading.Thread(target=self.monitor, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def heartbeat(self):
+        if not self.running:
+            return
+        self.last_beat = time.monotonic()
+        try:
+            self.root.after(int(self.interval * 1000), self.heartbeat)
+        except Exception:
+            self.running = False
+
+    def monitor(self):
+        stalled_since = None
+        while self.running:
+            time.sleep(self.interval)
+            beat = self.last_beat
+            lag = time.monotonic() - beat - self.interval
+            if lag > self.threshold:
+                if stalled_since != beat:
+                    # First sample of this stall: report where the loop is stuck
+                    stalled_since = beat
+                    self.stalls += 1
+                    log_info(
+                        f"[Stall] Tk loop blocked for over {lag * 1000:.0f} ms "
+                        f"(stall #{self.stalls})\n{self.capture_main_stack()}"
+                    )
+                continue
+            if stalled_since is not None:
+                # Loop recovered: report the full stall duration
+                duration = self.last_beat - stalled_since - self.interval
+                log_info(
+                    f"[Stall] Tk loop recovered after {duration * 1000:.0f} ms "
+                    f"(stall #{self.stalls})"
+                )
+                stalled_since = None
+
+    def capture_main_stack(self):
+        frame = sys._current_frames().get(self.main_ident)
+        if frame is None:
+            return "<main thread stack unavailable>"
+        return "".join(traceback.format_stack(frame))
+
+
+# -------------------- Network Loop --------------------
+class NetworkLoop:
+    """
+    One asyncio loop on a daemon thread for every websocket the client
+    holds, so sockets opened ahead of time can be used later from any thread.
+    - submit() schedules a coroutine and returns a concurrent Future
+    - run() does the same and waits for the result
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+# -------------------- Multi-bot Fan-out --------------------
+class BotFanOut:
+    """
+    One shadow websocket session per extra selected bot, on the client's
+    network loop. Each move is replayed on every shadow concurrently
+    (init from the mirror's position, select_bot, next_move) and every
+    reply is passed to on_reply(bot_id, uci, latency_s) on that thread.
+    - Shadows connect to `url` (FANOUT_URL), never to the game server
+    - Replies from an older round than the latest request are dropped
+    """
+
+    def __init__(self, net, url, bot_ids, engine_level, on_reply):
+        self.net = net
+        self.url = url
+        self.bot_ids = list(bot_ids)
+        self.engine_level = engine_level
+        self.on_reply = on_reply
+        self.sockets = {}
+        self.locks = {}
+        self.round = 0
+
+    def request(self, init, move):
+        """init: the init payload fields for the position (FEN or PGN)"""
+        self.round += 1
+        self.net.submit(self.fan_out(self.round, init, move))
+
+    async def fan_out(self, round_no, init, move):
+        await asyncio.gather(
+            *(self.ask(round_no, bot_id, init, move) for bot_id in self.bot_ids)
+        )
+
+    async def ask(self, round_no, bot_id, init, move):
+        # One exchange at a time per socket; a stale round reads its reply
+        # before the next one starts
+        lock = self.locks.setdefault(bot_id, asyncio.Lock())
+        async with lock:
+            if round_no != self.round:
+                return
+            t0 = time.perf_counter()
+            try:
+                ws = self.sockets.get(bot_id)
+                if ws is None:
+                    ws = self.sockets[bot_id] = await transport.connect(self.url)
+                codec = transport.codec_for(ws)
+                for payload in (
+                    {"action": "init", **init},
+                    {
+                        "action": "select_bot",
+                        "bot_id": bot_id,
+                        "engine_level": self.engine_level,
+                    },
+                    {"action": "next_move", "opponent_move": move},
+                ):
+                    await ws.send(transport.encode(payload, codec))
+                while True:
+                    data = transport.decode(await ws.recv())
+                    if data.get("type") == "engine_move":
+                        break
+                    if data.get("error"):
+                        raise RuntimeError(f"{bot_id}: {data['error']}")
+            except Exception as e:
+                ws = self.sockets.pop(bot_id, None)
+                if ws is not None:
+                    await ws.close()
+                log_exception(e)
+                return
+            if round_no == self.round:
+                reply = f"{data['move']['from']}{data['move']['to']}"
+                self.on_reply(bot_id, reply, time.perf_counter() - t0)
+
+    async def close_sockets(self):
+        sockets, self.sockets = self.sockets, {}
+        for ws in sockets.values():
+            try:
+                await ws.close()
+            except Exception:
+                pass
 
+    def close(self):
+        # Called from the Tk thread: the sockets close on the network loop
+        self.round += 1
+        self.net.submit(self.close_sockets())
 
-def log_info(message):
-    with open("info.log", "a", encoding="utf-8") as f:
-        f.write(f"{time.ctime()}\n")
-        f.write(message)
-        f.write("\n\n")
+
+# -------------------- Game List --------------------
+def insert_game_rows(tree, games, rows):
+    """Adds the games not yet in `rows` (row id -> game) to the games Treeview"""
+    for g in games:
+        safe_id = g.uuid or str(time.time())
+        if safe_id in rows:
+            continue
+        rows[safe_id] = g
+        game_label = f"{g.white} vs {g.black} ({g.halfmove_count or 'N/A'} moves)"
+        tree.insert("", "end", iid=safe_id, values=(game_label, g.display_result))
 
 
 # -------------------- ChessBoard --------------------
@@ -55,6 +687,8 @@ class ChessBoard(tk.Frame):
         self.tiles = {}
         self.selected = None
         self.suggested_move = None  # new
+        self.premove_squares = set()
+        self.alternative_squares = set()
         self.square_size = square_size
         self.create_board()
 
@@ -94,12 +728,31 @@ class ChessBoard(tk.Frame):
                 piece_code = board_state.get(sq, "")
                 lbl = self.tiles[(r, c)]
                 piece = PIECES.get(piece_code, "")
-                lbl.config(text=piece)
-                # highlight suggested move
-                if suggested_move and sq in suggested_move:
-                    lbl.config(bg="#f7ec6f")
-                else:
-                    lbl.config(bg="#eeeed2" if (r + c) % 2 == 0 else "#769656")
+                lbl.config(text=piece, bg=self.tile_color(sq, r, c))
+
+    def tile_color(self, sq, r, c):
+        # highlight suggested move, then queued premoves, then other bots' picks
+        if self.suggested_move and sq in self.suggested_move:
+            return "#f7ec6f"
+        if sq in self.premove_squares:
+            return "#b58cff"
+        if sq in self.alternative_squares:
+            return "#f0a35e"
+        return "#eeeed2" if (r + c) % 2 == 0 else "#769656"
+
+    def repaint_tiles(self):
+        for (r, c), lbl in self.tiles.items():
+            lbl.config(bg=self.tile_color(f"{chr(ord('a') + c)}{8 - r}", r, c))
+
+    def mark_premoves(self, squares):
+        self.premove_squares = set(squares)
+        self.repaint_tiles()
+
+    def mark_alternatives(self, squares, suggested_move=None):
+        if suggested_move:
+            self.suggested_move = suggested_move
+        self.alternative_squares = set(squares)
+        self.repaint_tiles()
 
     def on_click(self, row, col):
         if not self.client.listening or not self.client.game_active:
@@ -136,6 +789,10 @@ class ChessClient:
         self.root.overrideredirect(True)
         self.root.configure(bg="#000000")
 
+        # ========== UI Dispatch ==========
+        self.ui = UIDispatcher(self.root)
+        self.ui.start()
+
         # ========== Window Drag ==========
         self.offset_x = 0
         self.offset_y = 0
@@ -165,6 +822,11 @@ class ChessClient:
         self.update_status("Welcome! Login or Continue as guest.")
         self.pgn = None
         self.move_no = 0
+        # Position a start-from-move game begins at; sent as FEN + moves,
+        # with the full PGN as fallback for servers that don't take it
+        self.start_board = None
+        self.init_mode = "pgn"
+        self.init_note = ""
 
         title_label = tk.Label(
             self.main_frame,
@@ -235,10 +897,8 @@ class ChessClient:
         self.toggle_board_btn.pack(pady=4)
         self.toggle_board_btn.pack_forget()
 
-        # ========== Chess Board ==========
-        self.board_frame = ChessBoard(self.main_frame, self)
-        self.board_frame.pack(pady=(8, 0))
-        self.board_frame.pack_forget()
+        # ========== Chess Board (built on first show) ==========
+        self._board_frame = None
 
         # ========== Status Label ==========
         self.status_label = tk.Label(
@@ -257,29 +917,115 @@ class ChessClient:
         )
         self.status_label.pack(anchor="w", fill="x", pady=(8, 6))
 
-        # ========== Current Bot ==========
-        self.current_bot_frame = tk.Frame(self.main_frame, bg="#000000", pady=4)
-        self.current_bot_avatar = tk.Label(self.current_bot_frame, bg="#000000")
+        # ========== Current Bot (built on first show) ==========
+        self._current_bot_frame = None
+
+        # ========== Divider ==========
+        tk.Frame(self.main_frame, bg="#333333", height=1).pack(fill="x", pady=(10, 6))
+
+        # ========== Action Buttons (built on first show) ==========
+        self._action_frame = None
+
+        # ========== Game State Variables ==========
+        self.game_active = False
+        self.listening = True
+        self.ws = None
+        self.worker = None  # worker.WorkerClient when WORKER_PROCESS is set
+        self.waiting_for_init = False
+        self.codec = None  # payload encoding agreed with the server
+        # Pre-opened channels (see warm_up)
+        self._net = None
+        self.net_lock = threading.Lock()
+        self.http = None
+        self.http_lock = threading.Lock()
+        self.standby = None
+        self.socket_source = "new"
+        self.game_requested_at = 0.0
+        self.recorder = None  # transport.SessionRecorder when --record is given
+        self.from_sq = ""
+        self.to_sq = ""
+        self.key_buffer = []
+        self.move_timer = None
+        self.processing = False
+        self.bots = []
+        # Known before connecting, from the catalogue stored last session
+        self.catalogue = catalogue.BotCatalogue(BOTS_PATH).load()
+        self.pending_selection = None  # select_bot made before the game started
+        self.selected_bots = []
+        self.engine_move_pending = False
+        self.opening_tree = None
+        self.side = None
+        self.mirror = None  # chess.Board kept in step with the server state
+        # (from, to, promotion piece or None) entered while a reply is pending
+        self.premoves = []
+        self.undos_pending = 0  # undo requests whose reply has not come in
+        self.promotion_choice = None  # piece picked with Promote, for the next move
+        self.last_sent = None
+        # Local move/undo shown before the server confirms it
+        self.optimistic = None
+        self.confirmed_boards = []
+        self.mirror_lock = threading.Lock()
+        self.pending_note = ""
+        self.book = None
+        self.ponderer = ponder.Ponderer(PONDER_ENGINE) if PONDER_ENGINE else None
+        # Multi-bot fan-out: bot name -> (move, latency) for the current move
+        self.fanout = None
+        self.primary_bot = "server"
+        self.consensus = {}
+        self.consensus_lock = threading.Lock()
+        self.bot_latency = {}  # bot name -> [seconds]
+        self.move_sent_at = None
+        # Interim analysis for the pending move: multipv index -> line
+        self.analysis = {}
+        # Confirmed moves of the live game, for scrubbing and PGN export
+        self.history = None
+        self.scrub_ply = None  # ply shown on the board, None = live
+        self.history_var = None
+
+        # ========== Network Warm-up ==========
+        self.root.after(WARMUP_DELAY_MS, self.warm_up)
+
+        # ========== Loop Watchdog ==========
+        self.watchdog = LoopWatchdog(self.root)
+        self.watchdog.start()
+
+    # -------------------- Deferred Widgets --------------------
+    @property
+    def board_frame(self):
+        if self._board_frame is None:
+            self._board_frame = ChessBoard(self.main_frame, self)
+        return self._board_frame
+
+    @property
+    def current_bot_frame(self):
+        if self._current_bot_frame is None:
+            self.build_current_bot_frame()
+        return self._current_bot_frame
+
+    @property
+    def action_frame(self):
+        if self._action_frame is None:
+            self.build_action_frame()
+        return self._action_frame
+
+    def build_current_bot_frame(self):
+        self._current_bot_frame = tk.Frame(self.main_frame, bg="#000000", pady=4)
+        self.current_bot_avatar = tk.Label(self._current_bot_frame, bg="#000000")
         self.current_bot_avatar.pack(side="left", padx=(0, 6))
         self.current_bot_label = tk.Label(
-            self.current_bot_frame,
+            self._current_bot_frame,
             text="",
             fg="#00ff99",
             bg="#000000",
             font=("Courier New", 11, "bold"),
         )
         self.current_bot_label.pack(side="left")
-        self.current_bot_frame.pack(anchor="center")
-        self.current_bot_frame.pack_forget()
-
-        # ========== Divider ==========
-        tk.Frame(self.main_frame, bg="#333333", height=1).pack(fill="x", pady=(10, 6))
 
-        # ========== Action Buttons ==========
-        self.action_frame = tk.Frame(self.main_frame, bg="#000000")
+    def build_action_frame(self):
+        self._action_frame = tk.Frame(self.main_frame, bg="#000000")
 
         # Top Row — Confirm, Undo, Cancel
-        top_actions = tk.Frame(self.action_frame, bg="#000000")
+        top_actions = tk.Frame(self._action_frame, bg="#000000")
         self.confirm_btn = tk.Button(
             top_actions,
             text="✓ Confirm Move",
@@ -292,7 +1038,7 @@ class ChessClient:
         self.undo_btn = tk.Button(
             top_actions,
             text="↺ Undo",
-            command=lambda: asyncio.run(self.send_undo()),
+            command=self.undo_move,
             bg="#444444",
             fg="white",
             font=("Segoe UI", 9),
@@ -313,11 +1059,11 @@ class ChessClient:
         top_actions.pack(anchor="center", pady=(0, 6))
 
         # Bottom Row — Promote, Select Bot
-        bottom_actions = tk.Frame(self.action_frame, bg="#000000")
+        bottom_actions = tk.Frame(self._action_frame, bg="#000000")
         self.promote_btn = tk.Button(
             bottom_actions,
             text="♕ Promote",
-            command=lambda: asyncio.run(self.send_promotion()),
+            command=self.ask_promotion,
             bg="#444444",
             fg="white",
             font=("Segoe UI", 9),
@@ -332,37 +1078,107 @@ class ChessClient:
             font=("Segoe UI", 9),
             width=12,
         )
+        self.stop_btn = tk.Button(
+            bottom_actions,
+            text="⏹ Use Best",
+            command=self.use_current_best,
+            bg="#444444",
+            fg="white",
+            font=("Segoe UI", 9),
+            width=10,
+        )
         self.promote_btn.pack(side="left", padx=4)
         self.bot_btn.pack(side="left", padx=4)
+        self.stop_btn.pack(side="left", padx=4)
         bottom_actions.pack(anchor="center", pady=(0, 4))
 
-        self.action_frame.pack_forget()
-
-        # ========== Game State Variables ==========
-        self.game_active = False
-        self.listening = True
-        self.ws = None
-        self.from_sq = ""
-        self.to_sq = ""
-        self.key_buffer = []
-        self.move_timer = None
-        self.processing = False
-        self.bots = []
-        self.engine_move_pending = False
+        # Typed move row — SAN or UCI, Enter sends
+        typed_actions = tk.Frame(self._action_frame, bg="#000000")
+        tk.Label(
+            typed_actions,
+            text="⌨",
+            fg="#00ff99",
+            bg="#000000",
+            font=("Segoe UI", 10),
+        ).pack(side="left", padx=(4, 2))
+        self.move_var = tk.StringVar()
+        self.move_entry = tk.Entry(
+            typed_actions,
+            textvariable=self.move_var,
+            font=("Consolas", 10),
+            bg="#1e1e1e",
+            fg="white",
+            insertbackground="white",
+            width=18,
+        )
+        self.move_entry.pack(side="left", padx=4)
+        self.move_entry.bind("<Return>", lambda e: self.submit_typed_move())
+        self.move_entry.bind("<Escape>", lambda e: self.move_var.set(""))
+        typed_actions.pack(anchor="center", pady=(0, 4))
+
+        # History row — scrub the recorded game, export it as PGN
+        history_actions = tk.Frame(self._action_frame, bg="#000000")
+        for text, step in (("⏮", None), ("◀", -1), ("▶", 1)):
+            tk.Button(
+                history_actions,
+                text=text,
+                command=(lambda s=step: self.scrub(s)),
+                bg="#444444",
+                fg="white",
+                font=("Segoe UI", 9),
+                width=3,
+            ).pack(side="left", padx=2)
+        self.history_var = tk.StringVar(value="Live")
+        tk.Label(
+            history_actions,
+            textvariable=self.history_var,
+            fg="#00ff99",
+            bg="#000000",
+            font=("Consolas", 10),
+            width=9,
+        ).pack(side="left", padx=4)
+        tk.Button(
+            history_actions,
+            text="⏭ Live",
+            command=self.scrub_live,
+            bg="#444444",
+            fg="white",
+            font=("Segoe UI", 9),
+            width=6,
+        ).pack(side="left", padx=2)
+        tk.Button(
+            history_actions,
+            text="💾 PGN",
+            command=self.export_history,
+            bg="#444444",
+            fg="white",
+            font=("Segoe UI", 9),
+            width=7,
+        ).pack(side="left", padx=2)
+        history_actions.pack(anchor="center", pady=(0, 4))
 
     # -------------------- Clear buffer --------------------
-    def clear_buffer(self):
+    def clear_input(self):
         self.from_sq = ""
         self.to_sq = ""
         self.key_buffer.clear()
         self.selected = None
-        self.update_status("[Clear] From Square")
+
+    def clear_buffer(self):
+        had_premoves = bool(self.premoves)
+        self.clear_input()
+        self.cancel_premoves()
+        self.update_status(
+            "[Clear] From Square, premoves" if had_premoves else "[Clear] From Square"
+        )
 
     # -------------------- Bot selector --------------------
     def show_bot_selector(self):
-        if not self.bots:
+        bot_list = self.bots or self.catalogue.list()
+        if not bot_list:
             self.update_status("No bots available")
             return
+        preselected = self.selected_bots or self.catalogue.selected
 
         selector = tk.Toplevel(self.root)
         selector.title("Select Bot")
@@ -383,24 +1199,44 @@ class ChessClient:
         bot_frame = tk.Frame(selector, bg="black")
         bot_frame.pack(anchor="w", pady=2)
 
-        for bot in self.bots:
-            var = tk.BooleanVar(value=False)
+        # Avatars load on the thumbnail pool (downloaded if not cached) and
+        # replace their placeholders as they arrive
+        try:
+            avatars = thumbnails.ThumbnailCache(THUMBS_DIR)
+        except ImportError:
+            avatars = None  # Pillow not installed: no avatars
+        avatar_labels = {}
+
+        def load_avatar(bot):
+            from PIL import Image
+            from io import BytesIO
+
+            data = self.catalogue.avatar(bot, self.http_session())
+            return Image.open(BytesIO(data)).resize((32, 32))
+
+        def put_avatar(bot_id, img):
+            if img is None or not selector.winfo_exists():
+                return
+            from PIL import ImageTk
+
+            photo = ImageTk.PhotoImage(img)
+            avatar_labels[bot_id].config(image=photo, width=32, height=32)
+            avatar_labels[bot_id].image = photo
+
+        for bot in bot_list:
+            var = tk.BooleanVar(value=bot["id"] in preselected)
             bot_vars[bot["id"]] = var
 
             b_row = tk.Frame(bot_frame, bg="black")
-            try:
-                from PIL import Image, ImageTk
-                import requests
-                from io import BytesIO
-
-                resp = requests.get(bot["avatar"], timeout=2)
-                img = Image.open(BytesIO(resp.content)).resize((32, 32))
-                bot_img = ImageTk.PhotoImage(img)
-                bot_label = tk.Label(b_row, image=bot_img, bg="black")
-                bot_label.image = bot_img
-                bot_label.pack(side="left", padx=(0, 4))
-            except Exception:
-                pass
+            if avatars is not None and catalogue.avatar_hash(bot):
+                placeholder = tk.Label(b_row, bg="#222", width=4, height=2)
+                placeholder.pack(side="left", padx=(0, 4))
+                avatar_labels[bot["id"]] = placeholder
+                avatars.fetch(
+                    bot["id"],
+                    lambda bot=bot: load_avatar(bot),
+                    lambda key, img: self.ui.post(None, put_avatar, key, img),
+                )
 
             tk.Checkbutton(
                 b_row,
@@ -412,10 +1248,18 @@ class ChessClient:
             ).pack(side="left")
             b_row.pack(anchor="w", pady=2)
 
+        def close_avatars(event):
+            if event.widget is selector and avatars is not None:
+                avatars.close()
+
+        selector.bind("<Destroy>", close_avatars, add="+")
+
         # Engine level scale (optional, can be implemented per bot)
         level_scale = tk.Scale(
             selector, from_=1, to=25, orient="horizontal", bg="black", fg="white"
         )
+        if self.catalogue.engine_level:
+            level_scale.set(self.catalogue.engine_level)
         level_scale.pack(fill="x", padx=6, pady=(4, 6))
 
         def process_selection():
@@ -427,18 +1271,41 @@ class ChessClient:
             # Save selected bot IDs in class
             self.selected_bots = selected
             engine_level = level_scale.get()
+            names = {bot["id"]: bot["name"] for bot in bot_list}
+            self.catalogue.remember_selection(selected, engine_level)
+            try:
+                self.catalogue.save()
+            except OSError as e:
+                log_exception(e)
+            self.primary_bot = names.get(selected[0], selected[0])
+
+            # The first bot plays on the game socket, the rest answer on
+            # shadow sessions
+            if self.fanout:
+                self.fanout.close()
+                self.fanout = None
+            if len(selected) > 1 and not FANOUT_URL:
+                self.update_status(
+                    f"[Bots] Only {self.primary_bot} plays: set CHESS_FANOUT_URL "
+                    "to ask the other bots as well"
+                )
+            elif len(selected) > 1:
+                self.fanout = BotFanOut(
+                    self.net,
+                    FANOUT_URL,
+                    selected[1:],
+                    engine_level,
+                    lambda bot_id, move, latency: self.record_reply(
+                        names.get(bot_id, bot_id), move, latency
+                    ),
+                )
 
-            # Send payload in a background thread
-            def send_payload():
-                for bot_id in selected:
-                    payload = {
-                        "action": "select_bot",
-                        "bot_id": bot_id,
-                        "engine_level": engine_level,
-                    }
-                    asyncio.run(self.ws.send(payload))  # Will run in thread
-
-            threading.Thread(target=send_payload, daemon=True).start()
+            payload = {
+                "action": "select_bot",
+                "bot_id": selected[0],
+                "engine_level": engine_level,
+            }
+            self.net.submit(self.select_bot(payload, self.primary_bot))
             selector.destroy()
 
         tk.Button(
@@ -457,7 +1324,7 @@ class ChessClient:
 
     # -------------------- Status --------------------
     def update_status(self, msg):
-        self.root.after(0, lambda: self.status.set(msg))
+        self.ui.post("status", self.status.set, msg)
         log_info(msg)
 
     # -------------------- Login Flow --------------------
@@ -518,16 +1385,13 @@ class ChessClient:
             login_win.update()
 
             try:
-                profile_req = requests.get(f"{API_URL}/api/chess/profile/{username}")
+                profile_req = self.http_session().get(
+                    f"{API_URL}/api/chess/profile/{username}"
+                )
                 profile = profile_req.json()
                 if profile_req.status_code != 200:
                     raise Exception(profile.get("error", "Unknown error"))
 
-                games_req = requests.get(f"{API_URL}/api/chess/games/{username}")
-                games = games_req.json()
-                if games_req.status_code != 200:
-                    raise Exception(games.get("error", "Unknown error"))
-
             except Exception as e:
                 if isinstance(e, requests.exceptions.ConnectionError):
                     error_label.config(text="Error: API server not reachable")
@@ -537,43 +1401,12 @@ class ChessClient:
                 error_label.config(text=f"Error: {str(e)}")
                 return
 
-            # ===== Process games =====
-            for g in games:
-                w_name = g["white"]["username"]
-                b_name = g["black"]["username"]
-                w_res = g["white"].get("result", "")
-                b_res = g["black"].get("result", "")
-                if w_res.lower() in [
-                    "agreed",
-                    "repetition",
-                    "insufficient",
-                    "stalemate",
-                ] or b_res.lower() in [
-                    "agreed",
-                    "repetition",
-                    "insufficient",
-                    "stalemate",
-                ]:
-                    g["display_result"] = f"Draw by {w_res or b_res}"
-                elif w_res != b_res:
-                    g["display_result"] = f"{w_name if w_res=='win' else b_name} won"
-                else:
-                    g["display_result"] = w_res.capitalize()
-
-                try:
-                    pgn_io = io.StringIO(g.get("pgn", ""))
-                    game_pgn = pgn.read_game(pgn_io)
-                    g["halfmove_count"] = (
-                        len(list(game_pgn.mainline_moves())) if game_pgn else 0
-                    )
-                except Exception:
-                    g["halfmove_count"] = max(0, len(g.get("pgn", "").split()))
-
             # ===== Success =====
             login_win.destroy()
             self.login_btn.pack_forget()
             self.continue_btn.pack_forget()
-            self.show_games(profile, games)
+            add_games, set_games_status = self.show_games(profile, [])
+            self.load_games(username, add_games, set_games_status)
 
         tk.Button(
             login_win,
@@ -588,6 +1421,56 @@ class ChessClient:
         # Allow pressing Enter to trigger login
         entry.bind("<Return>", lambda event: attempt_login())
 
+    def load_games(self, username, add_games, set_status):
+        # Stored games are shown first, then only newer games are fetched.
+        # Both run on a worker thread; rows are added on the Tk thread.
+        set_status("Loading games...")
+        store_path = os.path.join(CACHE_DIR, "games", f"{username.lower()}.json")
+
+        def on_games(batch):
+            self.ui.post(None, add_games, batch)
+
+        def worker():
+            try:
+                store = archive.GameStore(store_path).load()
+            except Exception as e:
+                log_exception(e)
+                store = archive.GameStore(store_path)
+            if store.games:
+                on_games(list(store.games))
+                self.ui.post(
+                    "games_status", set_status, f"{len(store.games)} games, syncing..."
+                )
+            try:
+                new = archive.sync_archive(
+                    API_URL, username, store, on_games, http=self.http_session()
+                )
+                self.ui.post(
+                    "games_status", set_status, f"{len(store.games)} games ({new} new)"
+                )
+            except Exception as e:
+                if isinstance(e, requests.exceptions.ConnectionError):
+                    self.ui.post(
+                        "games_status", set_status, "Error: API server not reachable"
+                    )
+                else:
+                    log_exception(e)
+                    self.ui.post("games_status", set_status, f"Error: {str(e)}")
+            self.index_openings(username, store)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def index_openings(self, username, store):
+        # Runs on the load_games worker; only games not yet indexed are added
+        tree_path = os.path.join(CACHE_DIR, "openings", f"{username.lower()}.json")
+        try:
+            tree = openings.OpeningTree(tree_path).load()
+            if tree.update(store.games):
+                tree.save()
+            self.opening_tree = tree
+        except Exception as e:
+            log_exception(e)
+
     # -------------------- Game Selection / Viewer --------------------
     def show_games(self, profile, games):
         top = tk.Toplevel(self.root)
@@ -626,9 +1509,11 @@ class ChessClient:
         if profile.get("country"):
             headers = {"User-Agent": "ChessAutomation/1.0"}
             try:
-                country_data = requests.get(
-                    profile.get("country"), headers=headers
-                ).json()
+                country_data = (
+                    self.http_session()
+                    .get(profile.get("country"), headers=headers)
+                    .json()
+                )
                 tk.Label(
                     left,
                     text=f"Country: {country_data.get('name', profile.get('country'))}",
@@ -641,6 +1526,17 @@ class ChessClient:
 
         tk.Label(left, text=" ", bg="#121212").pack()  # spacer
 
+        games_status = tk.Label(
+            left,
+            text="",
+            fg="#888888",
+            bg="#121212",
+            font=("Segoe UI", 9),
+            wraplength=200,
+            justify="left",
+        )
+        games_status.pack(anchor="w")
+
         # ---------------- Move Spinbox ----------------
         tk.Label(
             left,
@@ -689,6 +1585,23 @@ class ChessClient:
         style_button(view_btn, bg="#444", fg="white", hover_bg="#555")
         view_btn.pack(fill="x", pady=(0, 6))
 
+        # ---------------- Thumbnails ----------------
+        preview = tk.Frame(left, bg="#121212")
+        preview.pack(anchor="w", pady=(2, 0))
+        preview_labels = {}
+        for slot, caption in (("start", "Start move"), ("final", "Final")):
+            column = tk.Frame(preview, bg="#121212")
+            preview_labels[slot] = tk.Label(column, bg="#121212")
+            preview_labels[slot].pack()
+            tk.Label(
+                column,
+                text=caption,
+                fg="#888888",
+                bg="#121212",
+                font=("Segoe UI", 8),
+            ).pack()
+            column.pack(side="left", padx=(0, 4))
+
         def close():
             top.destroy()
             self.login_btn.pack(pady=4)
@@ -733,15 +1646,120 @@ class ChessClient:
         )
 
         uuid_to_game = {}
-        for g in games:
-            safe_id = g.get("uuid") or str(time.time())
-            uuid_to_game[safe_id] = g
-            white = g.get("white", {}).get("username", "Unknown")
-            black = g.get("black", {}).get("username", "Unknown")
-            result = g.get("display_result", "")
-            halfmoves = g.get("halfmove_count", 0)
-            game_label = f"{white} vs {black} ({halfmoves or 'N/A'} moves)"
-            tree.insert("", "end", iid=safe_id, values=(game_label, result))
+        backlog = []  # games waiting for their rows, in arrival order
+
+        def add_games(batch):
+            # Called again for every batch that arrives while the archive streams
+            backlog.extend(batch)
+            if len(backlog) == len(batch):
+                insert_next_rows()
+
+        def insert_next_rows():
+            # A chunk of rows per Tk tick, so a large archive never blocks the loop
+            if not top.winfo_exists():
+                return
+            chunk = backlog[:GAME_ROWS_PER_TICK]
+            del backlog[:GAME_ROWS_PER_TICK]
+            insert_game_rows(tree, chunk, uuid_to_game)
+            if not tree.focus():
+                preselect_first()
+            if backlog:
+                top.after(1, insert_next_rows)
+            else:
+                schedule_prefetch()
+
+        def set_games_status(text):
+            if top.winfo_exists():
+                games_status.config(text=text)
+
+        # ---------------- Thumbnail Rendering ----------------
+        try:
+            thumbs = thumbnails.ThumbnailCache(THUMBS_DIR)
+        except ImportError:
+            thumbs = None  # Pillow not installed: no previews
+        shown = {"start": None, "final": None}  # slot -> (uuid, ply) wanted
+        prefetch_job = [None]
+
+        def on_thumb(key, path):
+            # Pool thread; the image is loaded on the Tk thread
+            self.ui.post(None, put_thumb, key, path)
+
+        def put_thumb(key, path):
+            if not top.winfo_exists():
+                return
+            from PIL import Image, ImageTk
+
+            for slot, wanted in shown.items():
+                if wanted == key:
+                    img = ImageTk.PhotoImage(Image.open(path))
+                    preview_labels[slot].config(image=img)
+                    preview_labels[slot].image = img
+
+        def show_preview(g, start_ply=None):
+            """Final position of `g` and, if given, the chosen start ply"""
+            if thumbs is None or g is None:
+                return
+            for slot, ply in (("final", None), ("start", start_ply)):
+                key = (g.uuid, ply) if slot == "final" or ply is not None else None
+                if key == shown[slot]:
+                    continue
+                shown[slot] = key
+                preview_labels[slot].config(image="")
+                preview_labels[slot].image = None
+                if key is not None:
+                    thumbs.request(g, key[1], on_thumb)
+
+        def show_selected_preview():
+            g = uuid_to_game.get(tree.focus())
+            if g is None:
+                return
+            try:
+                start_ply = int(move_spin_var.get()) - 2
+            except ValueError:
+                start_ply = None
+            show_preview(g, start_ply)
+
+        def on_hover(event):
+            g = uuid_to_game.get(tree.identify_row(event.y))
+            if g is not None:
+                show_preview(g)
+
+        def visible_games():
+            rows = tree.get_children()
+            if not rows:
+                return []
+            first, last = tree.yview()
+            low = int(first * len(rows))
+            high = min(len(rows), int(last * len(rows)) + 1)
+            return [uuid_to_game[row] for row in rows[low:high]]
+
+        def prefetch():
+            # Rows in view first; queued renders for rows scrolled away are
+            # dropped, the previews being shown are kept
+            prefetch_job[0] = None
+            if thumbs is None or not top.winfo_exists():
+                return
+            in_view = visible_games()
+            keys = [(g.uuid, None) for g in in_view]
+            thumbs.keep_only(keys + [key for key in shown.values() if key])
+            for g in in_view:
+                thumbs.request(g, None, on_thumb)
+
+        def schedule_prefetch(*_):
+            # Scrolling reports every step; render once it settles
+            if thumbs is not None and prefetch_job[0] is None:
+                prefetch_job[0] = top.after(THUMB_PREFETCH_MS, prefetch)
+
+        def close_thumbs(event):
+            if event.widget is top and thumbs is not None:
+                thumbs.close()
+
+        tree.configure(yscrollcommand=schedule_prefetch)
+        tree.bind("<Motion>", on_hover)
+        tree.bind("<Leave>", lambda e: show_selected_preview())
+        move_spin.config(command=show_selected_preview)
+        move_spin.bind("<KeyRelease>", lambda e: show_selected_preview())
+        top.bind("<Destroy>", close_thumbs, add="+")
 
         # ---------------- Selection & Commands ----------------
         def on_select(event=None):
@@ -749,7 +1767,7 @@ class ChessClient:
             if not sel:
                 return
             g = uuid_to_game.get(sel)
-            hm = g.get("halfmove_count", 0)
+            hm = g.halfmove_count
             min_allowed = 2
             max_allowed = max(2, hm - 2)
             try:
@@ -762,6 +1780,7 @@ class ChessClient:
                 move_spin_var.set(str(max(min(cur, max_allowed), min_allowed)))
             except Exception:
                 move_spin_var.set(str(min_allowed))
+            show_selected_preview()
 
         tree.bind("<<TreeviewSelect>>", on_select)
 
@@ -792,7 +1811,7 @@ class ChessClient:
             except Exception:
                 messagebox.showerror("Error", "Invalid move number")
                 return
-            hm = g.get("halfmove_count", 0)
+            hm = g.halfmove_count
             min_allowed = 2
             max_allowed = max(2, hm - 2)
             if chosen < min_allowed or chosen > max_allowed:
@@ -800,23 +1819,33 @@ class ChessClient:
                     "Error", f"Choose between {min_allowed} and {max_allowed}"
                 )
                 return
-            self.pgn = g.get("pgn")
-            self.move_no = chosen - 2
+            # Decoded only now, when the session actually needs it
+            try:
+                board, moves = g.read_mainline()
+                for move in moves[: chosen - 2]:
+                    board.push(move)
+            except Exception as e:
+                log_exception(e)
+                board = None
             top.destroy()
-            self.start_ws()
-            self.toggle_board_btn.pack(pady=4)
+            self.start_from(g.pgn, chosen - 2, board)
 
         start_btn.config(command=start_from_selected)
 
         # Preselect first item
-        first = tree.get_children()
-        if first:
-            tree.selection_set(first[0])
-            tree.focus(first[0])
-            on_select()
+        def preselect_first():
+            first = tree.get_children()
+            if first:
+                tree.selection_set(first[0])
+                tree.focus(first[0])
+                on_select()
+
+        add_games(games)
+        return add_games, set_games_status
 
     def show_game_viewer(self, game):
         # Viewer window that allows stepping through PGN (board displayed)
+        # game: archive.GameRecord
         viewer = tk.Toplevel(self.root)
         viewer.title("Game Viewer")
         viewer.configure(bg="#000000")
@@ -826,7 +1855,7 @@ class ChessClient:
         # ======= Game Info =======
         info = tk.Label(
             viewer,
-            text=f"{game['white']['username']} vs {game['black']['username']}  -  {game.get('display_result','')}",
+            text=f"{game.white} vs {game.black}  -  {game.display_result}",
             fg="#00ff9f",  # neon green
             bg="#1a1a1a",  # slightly lighter than pure black
             font=("Segoe UI", 10, "bold"),
@@ -842,33 +1871,50 @@ class ChessClient:
         board_frame = ChessBoard(viewer, self)
         board_frame.pack(pady=(0, 6))
 
-        # ======= PGN Parsing =======
-        pgn_text = game.get("pgn", "")
+        # ======= Opening Explorer =======
+        explorer = tk.Label(
+            viewer,
+            text="",
+            fg="#cccccc",
+            bg="#000000",
+            font=("Consolas", 9),
+            justify="left",
+            anchor="w",
+        )
+        explorer.pack(fill="x", padx=8)
+
+        # ======= Mainline (binary move archive, PGN as fallback) =======
         try:
-            pgn_io = io.StringIO(pgn_text)
-            game_pgn = pgn.read_game(pgn_io)
-            board = game_pgn.board() if game_pgn else chess.Board()
-            moves = list(game_pgn.mainline_moves()) if game_pgn else []
+            board, moves = game.read_mainline()
         except Exception:
             board = chess.Board()
             moves = []
         move_index = 0
 
-        def board_state_from_board(bd):
-            state = {}
-            for sq in chess.SQUARES:
-                p = bd.piece_at(sq)
-                if p:
-                    color = "w" if p.color else "b"
-                    state[chess.SQUARE_NAMES[sq]] = f"{color}{p.symbol().upper()}"
-            return state
-
         def update_board():
-            bs = board_state_from_board(board)
+            bs = state_from_board(board)
             board_frame.update_board(bs)
             info.config(
-                text=f"{game['white']['username']} vs {game['black']['username']}  -  {game.get('display_result','')}    [{move_index}/{len(moves)}]"
+                text=f"{game.white} vs {game.black}  -  {game.display_result}    [{move_index}/{len(moves)}]"
             )
+            update_explorer()
+
+        def update_explorer():
+            if not self.opening_tree:
+                explorer.config(text="")
+                return
+            stats = self.opening_tree.lookup(board, limit=5)
+            if not stats:
+                explorer.config(text="Out of your opening book")
+                return
+            played = moves[move_index] if move_index < len(moves) else None
+            lines = []
+            for st in stats:
+                mark = "▶" if st["move"] == played else " "
+                lines.append(
+                    f"{mark} {st['san']:<7} {st['games']:>5} games  {st['score'] * 100:>3.0f}%"
+                )
+            explorer.config(text="\n".join(lines))
 
         # ======= Controls =======
         ctrl = tk.Frame(viewer, bg="#000000")
@@ -891,10 +1937,27 @@ class ChessClient:
             width=10,
         )
 
+        play_btn = tk.Button(
+            ctrl,
+            text="♟ Play from here",
+            command=lambda: play_from_here(),
+            bg="#444444",
+            fg="white",
+            font=("Segoe UI", 10, "bold"),
+            width=14,
+        )
+
         prev_btn.pack(side="left", padx=6, pady=4)
         next_btn.pack(side="left", padx=6, pady=4)
+        play_btn.pack(side="left", padx=6, pady=4)
         ctrl.pack(pady=(0, 8))
 
+        def play_from_here():
+            if board.is_game_over():
+                messagebox.showerror("Error", "The game is over at this move")
+                return
+            self.start_from(game.pgn, move_index, board.copy())
+
         def next_move():
             nonlocal move_index
             if move_index < len(moves):
@@ -1008,105 +2071,655 @@ class ChessClient:
             self.board_frame.pack(pady=(8, 0))
             self.toggle_board_btn.config(text="Hide Board")
 
+    # -------------------- Warm-up --------------------
+    def warm_up(self):
+        """
+        Opens the channels a game will need while the welcome screen is up:
+        - a pooled HTTP session, checked against the API's /ping
+        - a standby websocket, handed to the first game (not with the worker
+          process, which opens the game socket itself)
+        - the bot catalogue, refreshed with only the changes since last time
+        """
+
+        def worker():
+            t0 = time.perf_counter()
+            try:
+                self.http_session().get(PING_URL, timeout=3)
+            except Exception:
+                self.update_status("Server not reachable yet; will retry on use.")
+                return
+            ping_ms = (time.perf_counter() - t0) * 1000
+            self.refresh_catalogue()
+            if not WORKER_PROCESS:
+                try:
+                    self.net.run(self.open_standby(), timeout=5)
+                except Exception as e:
+                    log_exception(e)
+            if not self.game_active:
+                self.update_status(
+                    f"Welcome! Login or Continue as guest. (server {ping_ms:.0f} ms)"
+                )
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    @property
+    def net(self):
+        # Started on first use, so asyncio is not imported before the window is up
+        with self.net_lock:
+            if self._net is None:
+                self._net = NetworkLoop()
+            return self._net
+
+    def http_session(self):
+        # Shared by every HTTP call so connections are reused
+        with self.http_lock:
+            if self.http is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=2, pool_maxsize=HTTP_POOL_SIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.http = session
+            return self.http
+
+    async def open_standby(self):
+        self.standby = await transport.connect(WS_URL)
+
+    async def open_game_socket(self):
+        # The standby socket is used once; a closed one is replaced
+        standby, self.standby = self.standby, None
+        if standby is not None and standby.close_code is None:
+            self.socket_source = "standby"
+            return standby
+        self.socket_source = "new"
+        return await transport.connect(WS_URL)
+
     # -------------------- WebSocket --------------------
     def start_ws(self):
         # Show action buttons but keep board hidden by default
         self.action_frame.pack(pady=(8, 6))
+        # Build the remaining deferred widgets here, on the Tk thread, before
+        # the socket thread starts updating them
+        self.board_frame
+        self.current_bot_frame
         self.game_active = True
 
         self.key_listener_thread = threading.Thread(
             target=self.key_listener, daemon=True
         )
         self.key_listener_thread.start()
-        self.ws_thread = threading.Thread(
-            target=lambda: asyncio.run(self.websocket_loop()), daemon=True
-        )
-        self.ws_thread.start()
+        self.game_requested_at = time.perf_counter()
+        if WORKER_PROCESS:
+            self.start_worker()
+        else:
+            self.net.submit(self.websocket_loop())
+
+    async def select_bot(self, payload, name):
+        # Runs on the network loop like handle_frame, so a selection made
+        # while the game is starting is either sent now or by the init frame
+        if self.connected() and not self.waiting_for_init:
+            await self.send_message(payload)
+            return
+        self.pending_selection = (payload, name)
+        self.update_status(f"{name} selected; sent when the game starts")
+
+    def refresh_catalogue(self):
+        try:
+            if self.catalogue.refresh(API_URL, self.http_session()):
+                self.catalogue.save()
+        except Exception as e:
+            # Servers without the endpoint still send the bots with init
+            log_info(f"Bot catalogue not refreshed: {e}")
 
     def update_bot_display(self, bot):
+        # Runs on the network loop: the avatar is fetched on the loop's
+        # executor so socket reads carry on, widgets change on the Tk loop
+        self.primary_bot = bot["name"]
+        self.ui.post("bot", self.show_bot, bot, None)
+        fetch = asyncio.get_running_loop().run_in_executor(
+            None, self.catalogue.avatar, bot, self.http_session()
+        )
+
+        def on_avatar(f):
+            if f.cancelled() or f.exception() is not None or not f.result():
+                return
+            if self.primary_bot == bot["name"]:  # not replaced meanwhile
+                self.ui.post("bot", self.show_bot, bot, f.result())
+
+        fetch.add_done_callback(on_avatar)
+
+    def show_bot(self, bot, avatar):
+        frame = self.current_bot_frame
         self.current_bot_label.config(text=f"{bot['name']} [{bot.get('rating','N/A')}]")
-        avatar_url = bot.get("avatar")
-        if avatar_url:
-            try:
-                from PIL import Image, ImageTk
-                import requests
-                from io import BytesIO
-
-                resp = requests.get(avatar_url)
-                img = Image.open(BytesIO(resp.content)).resize((32, 32))
-                self.current_bot_avatar.imgtk = ImageTk.PhotoImage(img)
-                self.current_bot_avatar.config(image=self.current_bot_avatar.imgtk)
-            except Exception:
-                self.current_bot_avatar.config(image="")
-        self.current_bot_frame.pack(anchor="w", pady=(4, 0))
+        try:
+            from PIL import Image, ImageTk
+            from io import BytesIO
+
+            img = Image.open(BytesIO(avatar)).resize((32, 32))
+            self.current_bot_avatar.imgtk = ImageTk.PhotoImage(img)
+            self.current_bot_avatar.config(image=self.current_bot_avatar.imgtk)
+        except Exception:
+            self.current_bot_avatar.config(image="")
+        frame.pack(anchor="w", pady=(4, 0))
+
+    def init_payload(self):
+        payload = {"action": "init"}
+        if self.init_mode == "fen":
+            payload.update(fen_init(self.start_board))
+        elif self.pgn:
+            payload["pgn"] = self.pgn
+            payload["move_no"] = self.move_no
+        else:
+            payload["side"] = self.side
+        return payload
+
+    # -------------------- Start From Move --------------------
+    def start_from(self, pgn_text, move_no, board=None):
+        """
+        Starts (or restarts, on the open connection) a game from ply
+        `move_no` of a stored game. With the position at hand the init is
+        FEN + moves since the last irreversible move instead of the PGN.
+        """
+        self.pgn = pgn_text
+        self.move_no = move_no
+        self.start_board = board
+        self.init_mode = "pgn"
+        if board is not None and fen_init(board) is not None:
+            self.init_mode = "fen"
+        if self.init_mode == "fen":
+            fen_size = len(transport.encode(self.init_payload()))
+            pgn_size = len(
+                transport.encode(
+                    {"action": "init", "pgn": pgn_text, "move_no": move_no}
+                )
+            )
+            self.init_note = f"init {fen_size} B vs {pgn_size} B PGN"
+        else:
+            self.init_note = ""
+        if self.connected():
+            # Same socket, new game: only the init round trip
+            self.game_requested_at = time.perf_counter()
+            self.engine_move_pending = False
+            self.premoves.clear()
+            self.net.submit(self.send_message(self.init_payload()))
+            self.wait_for_init()
+            return
+        self.start_ws()
+        self.toggle_board_btn.pack(pady=4)
+
+    def fall_back_to_pgn(self, reason):
+        # The server did not take the FEN init; send the full PGN instead
+        log_info(f"FEN init rejected ({reason}), falling back to PGN")
+        self.init_mode = "pgn"
+        self.init_note = "PGN fallback"
+        self.net.submit(self.send_message(self.init_payload()))
+
+    def wait_for_init(self):
+        current_time = time.time()
+        self.waiting_for_init = True
+
+        def update_status_with_time():
+            while self.waiting_for_init:
+                elapsed = time.time() - current_time
+                self.update_status(
+                    f"Connected to server. Waiting for game to start... ({elapsed:.2f}s)"
+                )
+                time.sleep(0.1)
+
+        self.update_status("Connected to server. Waiting for game to start...")
+        threading.Thread(target=update_status_with_time, daemon=True).start()
 
     async def websocket_loop(self):
         try:
-            async with websockets.connect(WS_URL) as websocket:
+            websocket = await self.open_game_socket()
+            async with websocket:
                 self.ws = websocket
-                init_payload = {"action": "init"}
-                if self.pgn:
-                    init_payload["pgn"] = self.pgn
-                    init_payload["move_no"] = self.move_no
-                else:
-                    init_payload["side"] = self.side
-                await websocket.send(json.dumps(init_payload))
-                current_time = time.time()
-                waiting_for_init = True
-
-                def update_status_with_time():
-                    nonlocal waiting_for_init
-                    while waiting_for_init:
-                        elapsed = time.time() - current_time
-                        self.update_status(
-                            f"Connected to server. Waiting for game to start... ({elapsed:.2f}s)"
-                        )
-                        time.sleep(0.1)
-
-                self.update_status("Connected to server. Waiting for game to start...")
-                threading.Thread(target=update_status_with_time, daemon=True).start()
+                self.codec = transport.codec_for(websocket)
+                await self.send_message(self.init_payload())
+                self.wait_for_init()
                 while True:
                     msg = await websocket.recv()
                     try:
-                        data = json.loads(msg)
+                        data = transport.decode(msg)
                     except Exception:
                         data = {"raw": msg}
-
-                    msg_type = data.get("type")
-                    state = data.get("state")
-                    if msg_type == "init" and data.get("current_bot"):
-                        bot = data["current_bot"]
-                        self.bots = data.get("bots", [])
-                        self.update_bot_display(bot)
-
-                        board_state = state
-                        self.board_frame.update_board(board_state)
-                        waiting_for_init = False
-
-                    if msg_type == "engine_move" and state:
-                        board_state = state
-                        self.engine_move_pending = False
-                        self.board_frame.update_board(
-                            board_state,
-                            f"{data['move']['from']}{data['move']['to']}",
-                        )
-
-                    status_msg = data.get("status") or data.get("error") or str(data)
-                    self.update_status(f"WS ▶ {status_msg}")
+                    await self.handle_frame(data)
         except Exception as e:
             if isinstance(e, (ConnectionRefusedError, OSError)):
-                self.update_status("Error: Unable to connect to server.")
-                return
+                self.on_socket_error("refused", e)
+            elif isinstance(e, websockets.exceptions.ConnectionClosedError):
+                self.on_socket_error("closed", e)
+            else:
+                self.on_socket_error("error", e)
+
+    def on_socket_error(self, kind, e):
+        if kind == "refused":
+            self.update_status("Error: Unable to connect to server.")
+            return
+        if isinstance(e, Exception):
             log_exception(e)
-            self.update_status(f"WebSocket error: {e}")
-            if isinstance(e, websockets.exceptions.ConnectionClosedError):
+        self.update_status(f"WebSocket error: {e}")
+        if kind == "closed":
+
+            def shut_down():
                 messagebox.showerror(
                     "Server Connection Closed", "Shutting down client, please restart."
                 )
                 self.on_close()
 
+            self.ui.post(None, shut_down)
+
+    async def handle_frame(self, data):
+        """One decoded server frame, from the game socket or the worker"""
+        if self.recorder:
+            self.recorder.record("in", data)
+
+        msg_type = data.get("type")
+        state = data.get("state")
+        if msg_type == "analysis":
+            self.on_analysis(data)
+            return
+        if self.init_mode == "fen" and self.waiting_for_init:
+            if data.get("error"):
+                self.fall_back_to_pgn(data["error"])
+                return
+            if (
+                msg_type == "init"
+                and state
+                and placement_from_state(state) != self.start_board.board_fen()
+            ):
+                self.fall_back_to_pgn("position differs")
+                return
+        if msg_type == "init" and data.get("current_bot"):
+            bot = data["current_bot"]
+            self.bots = data.get("bots", [])
+            self.update_bot_display(bot)
+            if self.bots and self.catalogue.merge(self.bots, full=True):
+                try:
+                    self.catalogue.save()
+                except OSError as e:
+                    log_exception(e)
+
+            board_state = state
+            self.ui.post("board", self.board_frame.update_board, board_state)
+            self.init_mirror(state)
+            self.waiting_for_init = False
+            if self.pending_selection:
+                payload, self.primary_bot = self.pending_selection
+                self.pending_selection = None
+                await self.send_message(payload)
+            ready_ms = (time.perf_counter() - self.game_requested_at) * 1000
+            note = f", {self.init_note}" if self.init_note else ""
+            data["status"] = (
+                f"{data.get('status') or 'Game started'} "
+                f"({ready_ms:.0f} ms, {self.socket_source} socket{note})"
+            )
+            if self.init_note:
+                log_info(f"Init from move {self.move_no}: {ready_ms:.0f} ms{note}")
+
+        if msg_type == "engine_move" and state:
+            board_state = state
+            self.engine_move_pending = False
+            self.sync_mirror(state)
+            reply = f"{data['move']['from']}{data['move']['to']}"
+            self.annotate_suggestion(reply)
+            self.ui.post("board", self.board_frame.update_board, board_state, reply)
+            if self.move_sent_at is not None:
+                self.record_reply(
+                    self.primary_bot,
+                    reply,
+                    time.perf_counter() - self.move_sent_at,
+                )
+            # Queued premove goes out the moment the reply is in
+            premove = self.next_premove()
+            if premove:
+                f, t, promotion = premove
+                self.begin_move(f, t, promotion)
+                await self.send_move(f, t, promotion)
+            else:
+                self.start_pondering()
+
+        elif state and msg_type != "init":
+            # Any other authoritative state, e.g. the reply to an undo
+            undo = self.undos_pending > 0
+            self.undos_pending -= undo
+            self.sync_mirror(state, undo=undo)
+            self.ui.post("board", self.board_frame.update_board, state)
+
+        if msg_type == "game_over":
+            # No engine_move follows: stop waiting for one
+            self.engine_move_pending = False
+            self.analysis = {}
+
+        if data.get("error") and self.optimistic:
+            self.engine_move_pending = False
+            self.rollback_optimistic(data["error"])
+
+        if msg_type == "engine_move" and self.fanout:
+            return  # the consensus view owns the status line
+        status_msg = data.get("status") or data.get("error") or str(data)
+        self.update_status(f"WS ▶ {status_msg}")
+
+    # -------------------- Worker Process --------------------
+    def start_worker(self):
+        """
+        Game socket, frame decoding and pondering in a child process; this
+        process polls the shared board block and event queue from the Tk loop.
+        """
+        self.worker = worker.WorkerClient(WS_URL, PONDER_ENGINE)
+        if self.ponderer:
+            self.ponderer.close()
+            self.ponderer = worker.RemotePonderer(self.worker)
+        self.socket_source = "worker"
+        self.worker.connect(self.init_payload())
+        self.wait_for_init()
+        self.root.after(WORKER_POLL_MS, self.poll_worker)
+
+    def poll_worker(self):
+        if self.worker is None:
+            return
+        snapshot = self.worker.snapshot()
+        if snapshot and snapshot[2] and self.engine_move_pending:
+            # Best line so far, published by the worker from analysis frames
+            _, suggestion, depth, score = snapshot
+            self.analysis[1] = {"depth": depth, "score": score, "pv": [suggestion]}
+            self.board_frame.mark_alternatives((), suggestion)
+            self.pending_note = f"Depth {depth}  {format_score(score)}  {suggestion}"
+        for data in self.worker.poll_events():
+            msg_type = data.get("type")
+            if msg_type == "ponder":
+                self.ponderer.add(data["generation"], data["key"], data["move"])
+                continue
+            if msg_type == "worker_error":
+                self.on_socket_error(data["kind"], data["error"])
+                continue
+            squares = data.pop("squares", None)
+            if squares is not None:
+                # The frame's own state; the block may already hold a later one
+                data["state"] = worker.decode_state(squares)
+            self.net.submit(self.handle_frame(data))
+        self.root.after(WORKER_POLL_MS, self.poll_worker)
+
+    # -------------------- Board Mirror / Book --------------------
+    def opponent_color(self):
+        # The client enters the opponent's moves; the engine answers for `side`
+        if self.side:
+            return chess.BLACK if self.side == "white" else chess.WHITE
+        return self.mirror.turn if self.mirror else chess.WHITE
+
+    def reset_mirror(self, state):
+        placement = placement_from_state(state)
+        self.mirror = None
+        if self.start_board is not None and self.start_board.board_fen() == placement:
+            self.mirror = self.start_board.copy()
+            return
+        if self.pgn:
+            # Replay the game locally to get the full history for this position
+            try:
+                game_pgn = pgn.read_game(io.StringIO(self.pgn))
+                board = game_pgn.board()
+                for move in game_pgn.mainline_moves():
+                    if board.board_fen() == placement and board.ply() >= self.move_no:
+                        break
+                    board.push(move)
+                if board.board_fen() == placement:
+                    self.mirror = board
+            except Exception as e:
+                log_exception(e)
+        if self.mirror is None:
+            start = chess.Board()
+            if start.board_fen() == placement:
+                self.mirror = start
+            else:
+                self.mirror = board_from_state(state, self.opponent_color())
+
+    def init_mirror(self, state):
+        with self.mirror_lock:
+            self.optimistic = None
+            self.undos_pending = 0
+            self.reset_mirror(state)
+            self.confirmed_boards = [self.mirror.copy()]
+            self.history = GameHistory(self.mirror)
+            self.scrub_ply = None
+
+    def sync_mirror(self, state, undo=False):
+        """
+        Reconciles the mirror (and any optimistic change) with a server state;
+        undo: the state is the reply to an undo request
+        """
+        with self.mirror_lock:
+            optimistic, self.optimistic = self.optimistic, None
+            undo = undo or bool(optimistic and optimistic["label"] == "undo")
+            if self.mirror is None:
+                self.reset_mirror(state)
+            else:
+                synced = sync_board(self.mirror, state, undo=undo)
+                if synced is None and optimistic:
+                    # The server did not do what we showed: start again from
+                    # the position before the local change
+                    synced = sync_board(optimistic["before"], state, undo=undo)
+                    self.show_rollback(optimistic["label"])
+                self.mirror = synced or board_from_state(state, self.opponent_color())
+            if not self.confirmed_boards or self.confirmed_boards[-1] != self.mirror:
+                self.confirmed_boards.append(self.mirror.copy())
+                del self.confirmed_boards[:-16]
+            self.record_history()
+
+    # -------------------- Game History --------------------
+    def record_history(self):
+        """Adds the confirmed mirror to the history; mirror_lock is held"""
+        if self.history is None or not self.history.sync(self.mirror):
+            self.history = GameHistory(self.mirror)
+        # A confirmed move brings the board back to the live position
+        self.scrub_ply = None
+        self.ui.post("history", self.show_history_position)
+        if self.mirror.is_game_over():
+            self.ui.post("export", self.export_history)
+
+    def annotate_suggestion(self, reply):
+        """Notes what was suggested for the engine's move, for the PGN export"""
+        parts = [f"{self.primary_bot}: {reply}"]
+        if self.move_sent_at is not None:
+            parts.append(f"{time.perf_counter() - self.move_sent_at:.2f}s")
+        best = self.analysis.get(1)
+        if best:
+            parts.append(f"depth {best['depth']} {format_score(best['score'])}")
+        if self.pending_note.startswith(("📖", "⚡")):
+            parts.append(self.pending_note[2:])  # book or pondered hint
+        with self.mirror_lock:
+            if self.history is not None:
+                self.history.annotate(", ".join(parts))
+
+    def show_history_position(self):
+        if self.history_var is None or self.history is None:
+            return
+        if self.scrub_ply is None:
+            self.history_var.set(f"Live {len(self.history)}")
+        else:
+            self.history_var.set(f"{self.scrub_ply}/{len(self.history)}")
+
+    def scrub(self, step):
+        """
+        Shows an earlier position of the live game on the board; purely local,
+        nothing is sent. step None jumps to the start, past the end is live.
+        """
+        if not self.history:
+            self.update_status("[History] No moves yet")
+            return
+        last = len(self.history)
+        ply = last if self.scrub_ply is None else self.scrub_ply
+        ply = 0 if step is None else max(0, ply + step)
+        if ply >= last:
+            self.scrub_live()
+            return
+        self.scrub_ply = ply
+        move = self.history.moves[ply - 1].uci()[:4] if ply else None
+        self.ui.post(
+            "board",
+            self.board_frame.update_board,
+            state_from_board(self.history.position(ply)),
+            move,
+        )
+        self.show_history_position()
+        self.update_status(f"[History] {self.history.describe(ply)}")
+
+    def scrub_live(self):
+        self.scrub_ply = None
+        with self.mirror_lock:
+            board = self.mirror.copy() if self.mirror is not None else None
+        if board is not None:
+            self.ui.post(
+                "board", self.board_frame.update_board, state_from_board(board)
+            )
+        self.show_history_position()
+        self.update_status("[History] Live position")
+
+    def export_history(self):
+        """
+        Writes the recorded game as PGN with the suggestion notes as comments
+        and undone moves as side lines; one file per game, rewritten on each
+        export.
+        """
+        with self.mirror_lock:
+            if not self.history:
+                self.update_status("[History] No moves yet")
+                return None
+            bot_side = self.side or "black"
+            names = {bot_side: self.primary_bot}
+            text = self.history.to_pgn(
+                {
+                    "Event": "Live game",
+                    "Site": "ChessAutomation",
+                    "White": names.get("white", "Opponent"),
+                    "Black": names.get("black", "Opponent"),
+                }
+            )
+            path = os.path.join(CACHE_DIR, "history", f"{self.history.file_id}.pgn")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        except OSError as e:
+            log_exception(e)
+            self.update_status(f"[History] Export failed: {e}")
+            return None
+        self.update_status(f"[History] Saved {path}")
+        return path
+
+    # -------------------- Optimistic Moves --------------------
+    def repaint_mirror(self, highlight=None):
+        state = state_from_board(self.mirror)
+        self.ui.post("board", self.board_frame.update_board, state, highlight)
+
+    def apply_optimistic_move(self, f, t, promotion=None):
+        """Plays f->t on the mirror and repaints now; returns the new position"""
+        with self.mirror_lock:
+            if self.mirror is None:
+                return None
+            move = move_from_squares(self.mirror, f, t, promotion=promotion)
+            if move is None:
+                return None
+            self.optimistic = {"before": self.mirror.copy(), "label": move.uci()}
+            self.mirror.push(move)
+            after = self.mirror.copy()
+        self.repaint_mirror(f"{f}{t}")
+        return after
+
+    def apply_optimistic_undo(self):
+        # Back to the previous confirmed position (server undo takes back a
+        # move and its reply)
+        with self.mirror_lock:
+            if self.mirror is None or len(self.confirmed_boards) < 2:
+                return
+            before = self.optimistic["before"] if self.optimistic else self.mirror
+            self.optimistic = {"before": before.copy(), "label": "undo"}
+            self.confirmed_boards.pop()
+            self.mirror = self.confirmed_boards[-1].copy()
+        self.repaint_mirror()
+
+    def rollback_optimistic(self, reason):
+        with self.mirror_lock:
+            optimistic, self.optimistic = self.optimistic, None
+            if not optimistic:
+                return
+            self.mirror = optimistic["before"]
+        self.repaint_mirror()
+        self.show_rollback(optimistic["label"], reason)
+
+    def show_rollback(self, label, reason="server state differs"):
+        def flash():
+            self.board_frame.config(bg="#ff4444")
+            self.board_frame.after(700, lambda: self.board_frame.config(bg="black"))
+
+        self.ui.post("flash", flash)
+        self.update_status(f"[Rollback] {label}: {reason}")
+
+    def open_book(self):
+        if self.book is None and os.path.exists(BOOK_PATH):
+            try:
+                self.book = polyglot.open_reader(BOOK_PATH)
+            except Exception as e:
+                log_exception(e)
+        return self.book
+
+    def suggest_from_book(self, after):
+        """
+        Shows the book reply in `after` (the position after the opponent's
+        move) straight away. The move is still sent to the server, whose
+        suggestion replaces this one.
+        """
+        if not self.open_book():
+            return
+        try:
+            entries = list(self.book.find_all(after))
+        except Exception as e:
+            log_exception(e)
+            return
+        if not entries:
+            return  # out of book, wait for the server
+        best = max(entries, key=lambda e: e.weight)
+        total = sum(e.weight for e in entries)
+        san = after.san(best.move)
+        self.ui.post(
+            "board",
+            self.board_frame.update_board,
+            state_from_board(after),
+            best.move.uci()[:4],
+        )
+        self.pending_note = f"📖 Book: {san} ({best.weight * 100 // total}%)"
+        self.update_status(self.pending_note)
+
+    def start_pondering(self):
+        if self.ponderer is None:
+            return
+        with self.mirror_lock:
+            if self.mirror is None or self.mirror.turn != self.opponent_color():
+                return
+            board = self.mirror.copy()
+        self.ponderer.start(board)
+
+    def suggest_from_ponder(self, after):
+        """Shows our pondered answer to the opponent's move, if one is cached"""
+        if self.ponderer is None:
+            return False
+        move = self.ponderer.lookup(after)
+        self.ponderer.stop()
+        if move is None:
+            return False
+        san = after.san(move)
+        self.ui.post(
+            "board",
+            self.board_frame.update_board,
+            state_from_board(after),
+            move.uci()[:4],
+        )
+        self.pending_note = f"⚡ Pondered: {san}"
+        self.update_status(self.pending_note)
+        return True
+
     def clear_buffer_timeout(self):
-        self.clear_buffer()
+        self.clear_input()
         self.update_status("[Timeout] Cleared From Square")
 
     # -------------------- Move / Undo / Promote --------------------
@@ -1115,49 +2728,319 @@ class ChessClient:
             self.update_status("[ERROR] Invalid move")
             return
 
+        f, t = self.from_sq, self.to_sq
+        self.from_sq = ""
+        self.to_sq = ""
+        if self.move_timer:
+            self.move_timer.cancel()
+        # The Promote button already sent the piece; a premove sends it again
+        # with the move, as the pending move may have used it up
+        promotion, self.promotion_choice = self.promotion_choice, None
+        if self.engine_move_pending:
+            self.queue_premove(f, t, promotion)
+            return
+        self.begin_move(f, t, promotion)
+        self.net.submit(self.send_move(f, t))
+
+    def begin_move(self, f, t, promotion=None):
+        # Local bookkeeping for a move that is about to be sent
         current_time = time.time()
+        self.engine_move_pending = True
+
+        self.pending_note = ""
 
         def update_status_with_time():
             while self.engine_move_pending:
                 elapsed = time.time() - current_time
-                self.update_status(f"Getting move suggestion... ({elapsed:.2f}s)")
+                note = f"\n{self.pending_note}" if self.pending_note else ""
+                self.update_status(f"Getting move suggestion... ({elapsed:.2f}s){note}")
                 time.sleep(0.1)
 
         self.update_status("Getting move suggestion...")
         threading.Thread(target=update_status_with_time, daemon=True).start()
-        asyncio.run(self.send_move(self.from_sq, self.to_sq))
-        self.engine_move_pending = True
-        self.from_sq = ""
-        self.to_sq = ""
+        after = self.apply_optimistic_move(f, t, promotion)
+        if after is not None and not self.suggest_from_ponder(after):
+            self.suggest_from_book(after)
+
+    # -------------------- Typed Moves --------------------
+    def focus_move_entry(self):
+        self.root.focus_force()
+        self.move_entry.focus_set()
+        self.move_entry.select_range(0, "end")
 
-    async def send_move(self, f, t):
-        if not self.ws:
+    def submit_typed_move(self):
+        if not self.game_active:
+            return
+        text = self.move_var.get()
+        pending = self.engine_move_pending
+        # While a reply is pending the move is resolved in the expected position
+        board = self.expected_board() if pending else self.mirror
+        try:
+            if board is None:
+                move = chess.Move.from_uci(text.strip().lower())
+                if not move:
+                    raise ValueError(f"{text.strip()} is not a legal move")
+            else:
+                move = resolve_typed_move(board, text)
+        except ValueError as e:
+            self.update_status(f"[ERROR] {e}")
             return
+        self.move_var.set("")
+        f = chess.square_name(move.from_square)
+        t = chess.square_name(move.to_square)
+        promotion = chess.piece_symbol(move.promotion) if move.promotion else None
+        if pending:
+            self.queue_premove(f, t, promotion)
+            return
+        self.begin_move(f, t, promotion)
+        self.net.submit(self.send_move(f, t, promotion))
+
+    # -------------------- Premoves --------------------
+    def expected_board(self):
+        """
+        Position the next premove will be played in: the mirror with the
+        pending move and every queued premove applied, and an unknown engine
+        reply (null move) after each of them.
+        """
+        if self.mirror is None:
+            return None
+        board = self.mirror.copy()
+        if self.optimistic:
+            # The pending move is already on the mirror
+            board.push(chess.Move.null())
+            sequence = self.premoves
+        else:
+            # Nothing may have been sent yet (e.g. a premove before our first move)
+            sequence = ([self.last_sent] if self.last_sent else []) + self.premoves
+        for f, t, promotion in sequence:
+            move = move_from_squares(board, f, t, legal=False, promotion=promotion)
+            if move is None:
+                return None
+            board.push(move)
+            board.push(chess.Move.null())
+        return board
+
+    def queue_premove(self, f, t, promotion=None):
+        board = self.expected_board()
+        if board is not None and not move_from_squares(board, f, t, legal=False):
+            self.update_status(f"[Premove] {f}{t} is not possible there")
+            return
+        self.premoves.append((f, t, promotion))
+        self.show_premoves()
+
+    def next_premove(self):
+        """
+        Called when the engine reply has arrived: returns the first queued
+        premove if it is legal in the new position, dropping the queue if not.
+        """
+        if not self.premoves:
+            return None
+        premove = self.premoves.pop(0)
+        f, t, _ = premove
+        if self.mirror is not None and not move_from_squares(self.mirror, f, t):
+            dropped = ", ".join(m[0] + m[1] for m in [premove] + self.premoves)
+            self.premoves.clear()
+            self.show_premoves()
+            self.update_status(f"[Premove] dropped {dropped} (illegal after reply)")
+            return None
+        self.show_premoves()
+        return premove
+
+    def cancel_premoves(self):
+        if self.premoves:
+            self.premoves.clear()
+            self.show_premoves()
+
+    def show_premoves(self):
+        squares = [sq for f, t, _ in self.premoves for sq in (f, t)]
+        self.ui.post("premoves", self.board_frame.mark_premoves, squares)
+        if self.premoves:
+            queued = ", ".join(f + t + (p or "") for f, t, p in self.premoves)
+            self.update_status(f"[Premove] queued: {queued}  (✕ Cancel clears)")
+
+    def connected(self):
+        return self.ws is not None or self.worker is not None
+
+    async def send_message(self, payload):
+        """Every frame to the game socket goes through here"""
+        if self.recorder:
+            self.recorder.record("out", payload)
+        if self.worker:
+            self.worker.send(payload)
+            return
+        await self.ws.send(transport.encode(payload, self.codec))
+
+    async def send_move(self, f, t, promotion=None):
+        if not self.connected():
+            return
+        if promotion:
+            # The server takes the promotion piece ahead of the move
+            await self.send_promotion_piece(promotion)
+        self.last_sent = (f, t, promotion)
         payload = {"action": "next_move", "opponent_move": f"{f}{t}"}
-        await self.ws.send(json.dumps(payload))
+        with self.consensus_lock:
+            self.consensus = {}
+        self.analysis = {}
+        self.move_sent_at = time.perf_counter()
+        if self.fanout:
+            self.ui.post("alternatives", self.board_frame.mark_alternatives, ())
+        await self.send_message(payload)
+        self.fan_out_move(f, t)
+
+    # -------------------- Interim Analysis --------------------
+    def on_analysis(self, data):
+        """
+        Interim search output for the pending move, one line per frame:
+        depth, multipv index, score ({"cp": n} or {"mate": n}) and pv.
+        The best line so far is highlighted, the other lines' first moves
+        are marked as alternatives.
+        """
+        if not self.engine_move_pending or not data.get("pv"):
+            return
+        index = data.get("multipv", 1)
+        if index == 1:
+            # A new depth makes the other lines stale until they come in again
+            depth = data.get("depth", 0)
+            stale = [k for k, v in self.analysis.items() if v.get("depth", 0) < depth]
+            for k in stale:
+                del self.analysis[k]
+        self.analysis[index] = {
+            "depth": data.get("depth", 0),
+            "score": data.get("score", {}),
+            "pv": data["pv"],
+        }
+        best = self.analysis.get(1) or self.analysis[min(self.analysis)]
+        others = {
+            sq
+            for k, line in self.analysis.items()
+            if line is not best
+            for sq in (line["pv"][0][:2], line["pv"][0][2:4])
+        }
+        self.ui.post(
+            "alternatives",
+            self.board_frame.mark_alternatives,
+            others,
+            best["pv"][0][:4],
+        )
+        lines = []
+        for k in sorted(self.analysis):
+            line = self.analysis[k]
+            lines.append(
+                f"{k}. {format_score(line['score']):>6}  {' '.join(line['pv'][:5])}"
+            )
+        self.pending_note = f"Depth {best['depth']}\n" + "\n".join(lines)
+
+    def use_current_best(self):
+        """Stops the search; the server answers with its best line so far"""
+        if not self.connected() or not self.engine_move_pending:
+            return
+        best = self.analysis.get(1)
+        if best:
+            self.pending_note = (
+                f"Using best so far: {best['pv'][0]} (depth {best['depth']})"
+            )
+        self.net.submit(self.send_message({"action": "stop"}))
+
+    # -------------------- Multi-bot Fan-out --------------------
+    def fan_out_move(self, f, t):
+        if self.fanout is None:
+            return
+        with self.mirror_lock:
+            if not self.confirmed_boards:
+                return
+            board = self.confirmed_boards[-1]
+            move = move_from_squares(board, f, t)
+            if move is None:
+                return
+            # FEN + moves since the last irreversible move where possible
+            init = fen_init(board)
+            if init is None:
+                init = {"pgn": str(pgn.Game.from_board(board))}
+                init["move_no"] = len(board.move_stack)
+        self.fanout.request(init, move.uci())
+
+    def record_reply(self, bot, move, latency):
+        """
+        Adds one bot's answer to the current move. The first answer is shown
+        on the board straight away; later ones refresh the consensus view.
+        """
+        with self.consensus_lock:
+            first = not self.consensus
+            self.consensus[bot] = (move, latency)
+            self.bot_latency.setdefault(bot, []).append(latency)
+            replies = dict(self.consensus)
+        if first and bot != self.primary_bot and self.mirror is not None:
+            # A shadow beat the game socket; show its pick on the local position
+            self.pending_note = f"First reply: {bot} {move}"
+            with self.mirror_lock:
+                state = state_from_board(self.mirror)
+            self.ui.post("board", self.board_frame.update_board, state, move)
+        if self.fanout is not None:
+            self.show_consensus(replies)
+
+    def show_consensus(self, replies):
+        votes = {}
+        for move, _ in replies.values():
+            votes[move] = votes.get(move, 0) + 1
+        ranked = sorted(votes.items(), key=lambda kv: -kv[1])
+        best = ranked[0][0]
+        others = {sq for move, _ in ranked[1:] for sq in (move[:2], move[2:4])}
+        expected = len(self.fanout.bot_ids) + 1
+        lines = [f"Consensus: {best} {votes[best]}/{len(replies)} (of {expected})"]
+        for bot, (move, latency) in sorted(replies.items(), key=lambda kv: kv[1][1]):
+            history = self.bot_latency.get(bot, [])
+            mean = sum(history) / len(history) if history else latency
+            mark = "✓" if move == best else "✗"
+            lines.append(f"{mark} {bot}: {move} {latency:.2f}s (avg {mean:.2f}s)")
+        self.ui.post("alternatives", self.board_frame.mark_alternatives, others, best)
+        # Also shown under the spinner while the game socket is still waiting
+        self.pending_note = "\n".join(lines)
+        self.update_status(self.pending_note)
+
+    def latency_report(self):
+        lines = ["Bot latency:"]
+        for bot, history in sorted(self.bot_latency.items()):
+            ordered = sorted(history)
+            lines.append(
+                f"  {bot}: {len(ordered)} replies, median {ordered[len(ordered) // 2]:.2f}s, "
+                f"max {ordered[-1]:.2f}s"
+            )
+        return "\n".join(lines)
+
+    def undo_move(self):
+        if not self.connected() or not self.game_active:
+            return
+        self.apply_optimistic_undo()
+        self.net.submit(self.send_undo())
 
     async def send_undo(self):
-        if not self.ws or not self.game_active:
+        if not self.connected() or not self.game_active:
             return
-        await self.ws.send(json.dumps({"action": "undo"}))
+        self.undos_pending += 1
+        await self.send_message({"action": "undo"})
 
-    async def send_promotion(self):
-        if not self.ws or not self.game_active:
+    def ask_promotion(self):
+        if not self.connected() or not self.game_active:
             return
         piece = simpledialog.askstring(
             "Promotion", "Enter piece (Q/R/B/N)", parent=self.root
         )
         if piece and piece.upper() in ["Q", "R", "B", "N"]:
-            await self.ws.send(
-                json.dumps({"action": "promote", "piece": piece.lower()})
-            )
+            # Also shown on the mirror when the next move is entered
+            self.promotion_choice = piece.lower()
+            self.net.submit(self.send_promotion_piece(piece))
         else:
             self.update_status("[ERROR] Invalid piece for promotion")
 
+    async def send_promotion_piece(self, piece):
+        if not self.connected() or not self.game_active:
+            return
+        await self.send_message({"action": "promote", "piece": piece.lower()})
+
     async def send_bot(self, bot_name):
-        if not self.ws:
+        if not self.connected():
             return
-        await self.ws.send(json.dumps({"action": "select_bot", "bot": bot_name}))
+        await self.send_message({"action": "select_bot", "bot": bot_name})
 
     def highlight_square(self, square, color="#00ff66", duration=1.0):
         """
@@ -1176,12 +3059,12 @@ class ChessClient:
         # Save original color
         original_color = "#eeeed2" if (row + col) % 2 == 0 else "#769656"
 
-        # Apply highlight visually
-        lbl = self.board_frame.tiles[(row, col)]
-        lbl.config(bg=color)
-        self._highlighted_squares[square] = time.time()
+        # Applied and removed on the Tk loop
+        def apply_highlight():
+            self.board_frame.tiles[(row, col)].config(bg=color)
+            self._highlighted_squares[square] = time.time()
+            self.root.after(int(duration * 1000), remove_highlight)
 
-        # Schedule removal after `duration` seconds
         def remove_highlight(sq=square):
             # Only remove if duration elapsed
             if (
@@ -1192,7 +3075,7 @@ class ChessClient:
                 lbl.config(bg=original_color)
                 del self._highlighted_squares[sq]
 
-        threading.Timer(duration, remove_highlight).start()
+        self.ui.post(("highlight", square), apply_highlight)
 
     # -------------------- Key Listener --------------------
     def key_listener(self):
@@ -1205,11 +3088,24 @@ class ChessClient:
             if keyboard.is_pressed("alt+`") and self.from_sq and self.to_sq:
                 self.processing = True
                 self.update_status(f"[Processing] {self.from_sq}{self.to_sq}")
-                asyncio.run(self.send_move(self.from_sq, self.to_sq))
-                self.clear_buffer()
+                self.confirm_move()
+                self.key_buffer.clear()
+                time.sleep(0.25)
+                continue
+
+            # Alt+/ jumps to typed move entry
+            if keyboard.is_pressed("alt+/"):
+                self.ui.post("focus", self.focus_move_entry)
                 time.sleep(0.25)
                 continue
 
+            # Alt+, / Alt+. step through the game history
+            if keyboard.is_pressed("alt+,") or keyboard.is_pressed("alt+."):
+                step = -1 if keyboard.is_pressed("alt+,") else 1
+                self.ui.post("scrub", self.scrub, step)
+                time.sleep(0.15)
+                continue
+
             # Capture square input (Alt held)
             if keyboard.is_pressed("alt"):
                 for key in "abcdefgh12345678":
@@ -1266,6 +3162,31 @@ class ChessClient:
     # -------------------- Close --------------------
     def on_close(self):
         self.listening = False
+        if self.watchdog:
+            self.watchdog.stop()
+        if self.ponderer:
+            log_info(self.ponderer.report())
+            self.ponderer.close()
+        if self.fanout:
+            log_info(self.latency_report())
+            self.fanout.close()
+        if self.history:
+            self.export_history()
+        if self.recorder:
+            self.recorder.close()
+        if self.worker:
+            self.worker.close()
+            self.worker = None
+        log_info(self.ui.report())
+        self.ui.stop()
+        if self._net:
+            for ws in (self.standby, self.ws):
+                if ws is not None:
+                    try:
+                        self._net.run(ws.close(), timeout=1)
+                    except Exception:
+                        pass
+            self._net.stop()
         try:
             self.root.destroy()
         except Exception:
@@ -1276,4 +3197,25 @@ class ChessClient:
 if __name__ == "__main__":
     root = tk.Tk()
     app = ChessClient(root)
+    if "--record" in sys.argv[:-1]:
+        # Payload log of the session, for `python bench.py wire`
+        app.recorder = transport.SessionRecorder(
+            sys.argv[sys.argv.index("--record") + 1]
+        )
+
+    def on_interactive():
+        interactive_s = time.perf_counter() - STARTUP_T0
+        # The report runs a second interpreter, so it is built off the Tk loop
+        if "--startup-report" in sys.argv:
+            output = print
+        elif interactive_s > STARTUP_BUDGET:
+            output = log_info
+        else:
+            return
+        threading.Thread(
+            target=lambda: output(startup_report(interactive_s)), daemon=True
+        ).start()
+
+    # First idle callback after the window is drawn = ready for input
+    root.after_idle(on_interactive)
     root.mainloop()
@@ -0,0 +1,27 @@
+"""
+Server addresses, cache location and log helpers shared by the client and
+its command line tools, so those never have to import the Tk GUI module
+(analysis pool processes in particular).
+"""
+
+import os
+import time
+import traceback
+
+API_URL = "http://127.0.0.1:8000"
+WS_URL = f"{API_URL.replace('http', 'ws')}/ws"
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".chess_client")
+
+
+def log_exception(e):
+    with open("error.log", "a") as f:
+        f.write(f"{time.ctime()}\n")
+        f.write(traceback.format_exc())
+        f.write("\n\n")
+
+
+def log_info(message):
+    with open("info.log", "a", encoding="utf-8") as f:
+        f.write(f"{time.ctime()}\n")
+        f.write(message)
+        f.write("\n\n")
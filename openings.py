@@ -0,0 +1,259 @@
+"""
+Opening explorer and Polyglot book building from game collections.
+
+Positions are keyed by their Zobrist (polyglot) hash, so transpositions
+share one node. Each node records the continuations played from it with
+counts, scores and links to the games they came from.
+
+Usage:
+    python openings.py book book.bin --pgn games.pgn [more.pgn ...]
+    python openings.py book book.bin --user <username>
+"""
+
+import argparse
+import json
+import os
+import struct
+import threading
+
+import chess
+import chess.pgn
+import chess.polyglot
+
+from archive import decode_move, encode_move
+
+# Plies of each game that are indexed
+OPENING_PLIES = 30
+# Game links kept per continuation
+LINK_LIMIT = 20
+# Bumped whenever the index file layout changes; older files are rebuilt
+TREE_VERSION = 1
+
+# Polyglot entry: key, move, weight, learn (big-endian)
+BOOK_ENTRY = struct.Struct(">QHHI")
+# Result weights for the side that played the move
+BOOK_WIN = 2
+BOOK_DRAW = 1
+
+
+def white_score(record):
+    """1, 0.5 or 0 for white, from the record's display_result"""
+    result = record.display_result
+    if result.startswith("Draw"):
+        return 0.5
+    if result == f"{record.white} won":
+        return 1.0
+    if result == f"{record.black} won":
+        return 0.0
+    return None
+
+
+# -------------------- Opening Tree --------------------
+class OpeningTree:
+    """
+    zobrist key -> {move code: [games, score x2 for the side to move, [uuids]]}
+    Scores are stored doubled (win 2, draw 1) so they stay integers.
+    """
+
+    def __init__(self, path, max_ply=OPENING_PLIES):
+        self.path = path
+        self.max_ply = max_ply
+        self.nodes = {}
+        self.indexed = set()
+        self.lock = threading.Lock()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != TREE_VERSION or data.get("max_ply") != self.max_ply:
+            return self
+        self.indexed = set(data["indexed"])
+        self.nodes = {
+            int(key, 16): {int(code): stats for code, stats in moves.items()}
+            for key, moves in data["nodes"].items()
+        }
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with self.lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": TREE_VERSION,
+                    "max_ply": self.max_ply,
+                    "indexed": list(self.indexed),
+                    "nodes": {
+                        f"{key:016x}": moves for key, moves in self.nodes.items()
+                    },
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, self.path)
+
+    def add_game(self, uuid, board, moves, score):
+        """Indexes the first max_ply moves of a game; score is 1/0.5/0 for white"""
+        with self.lock:
+            if uuid in self.indexed:
+                return False
+            self.indexed.add(uuid)
+            for move in moves[: self.max_ply]:
+                key = chess.polyglot.zobrist_hash(board)
+                stats = self.nodes.setdefault(key, {}).setdefault(
+                    encode_move(move), [0, 0, []]
+                )
+                stats[0] += 1
+                if score is not None:
+                    mover_score = score if board.turn == chess.WHITE else 1 - score
+                    stats[1] += int(mover_score * 2)
+                if len(stats[2]) < LINK_LIMIT:
+                    stats[2].append(uuid)
+                board.push(move)
+        return True
+
+    def update(self, records):
+        """Adds games that are not indexed yet; returns how many were added"""
+        added = 0
+        for g in records:
+            if g.uuid in self.indexed:
+                continue
+            try:
+                board, moves = g.read_mainline()
+            except Exception:
+                continue
+            added += self.add_game(g.uuid, board, moves, white_score(g))
+        return added
+
+    def lookup(self, board, limit=None):
+        """
+        Continuations from `board`, most played first, as dicts with
+        san, games, score (for the side to move) and uuids.
+        """
+        moves = self.nodes.get(chess.polyglot.zobrist_hash(board))
+        if not moves:
+            return []
+        ranked = sorted(moves.items(), key=lambda kv: -kv[1][0])[:limit]
+        stats = []
+        for code, (games, score2, uuids) in ranked:
+            move = decode_move(code)
+            stats.append(
+                {
+                    "san": board.san(move) if board.is_legal(move) else move.uci(),
+                    "move": move,
+                    "games": games,
+                    "score": score2 / (2 * games),
+                    "uuids": uuids,
+                }
+            )
+        return stats
+
+
+# -------------------- Polyglot Book --------------------
+def polyglot_move(board, move):
+    """Polyglot move encoding; castling is written as king takes own rook"""
+    if board.is_castling(move) and not board.chess960:
+        rook_file = 7 if chess.square_file(move.to_square) == 6 else 0
+        to_square = chess.square(rook_file, chess.square_rank(move.from_square))
+    else:
+        to_square = move.to_square
+    promo = move.promotion - 1 if move.promotion else 0
+    return (
+        chess.square_file(to_square)
+        | chess.square_rank(to_square) << 3
+        | chess.square_file(move.from_square) << 6
+        | chess.square_rank(move.from_square) << 9
+        | promo << 12
+    )
+
+
+def pgn_mainlines(paths):
+    """(starting board, moves, white score) for every game in the PGN files"""
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                result = game.headers.get("Result", "*")
+                score = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5}.get(result)
+                yield game.board(), list(game.mainline_moves()), score
+
+
+def record_mainlines(records):
+    """The same for archive.GameRecords"""
+    for g in records:
+        try:
+            board, moves = g.read_mainline()
+        except Exception:
+            continue
+        yield board, moves, white_score(g)
+
+
+def build_book(mainlines, path, max_ply=OPENING_PLIES):
+    """
+    Writes a Polyglot book from (board, moves, white score) tuples.
+    Each move is weighted by the results of the side that played it
+    (win 2, draw 1, loss 0); moves that only ever lost are left out.
+    Returns the number of entries written.
+    """
+    weights = {}
+    for board, moves, score in mainlines:
+        if score is None:
+            continue
+        for move in moves[:max_ply]:
+            mover_score = score if board.turn == chess.WHITE else 1 - score
+            weight = BOOK_WIN if mover_score == 1 else BOOK_DRAW if mover_score else 0
+            key = (chess.polyglot.zobrist_hash(board), polyglot_move(board, move))
+            weights[key] = weights.get(key, 0) + weight
+            board.push(move)
+
+    entries = sorted(
+        ((key, move, weight) for (key, move), weight in weights.items() if weight),
+        key=lambda e: (e[0], -e[2]),
+    )
+    # Weights are 16 bit; scale down the whole book if needed
+    scale = max((w for _, _, w in entries), default=0) / 0xFFFF
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for key, move, weight in entries:
+            if scale > 1:
+                weight = max(1, int(weight / scale))
+            f.write(BOOK_ENTRY.pack(key, move, weight, 0))
+    os.replace(tmp, path)
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Opening book tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    book = sub.add_parser("book", help="build a Polyglot .bin book")
+    book.add_argument("out")
+    book.add_argument("--pgn", nargs="+", default=[], help="PGN collections")
+    book.add_argument("--user", help="downloaded archive of this chess.com user")
+    book.add_argument("--plies", type=int, default=OPENING_PLIES)
+    args = parser.parse_args()
+
+    if args.command == "book":
+        mainlines = []
+        if args.pgn:
+            mainlines.append(pgn_mainlines(args.pgn))
+        if args.user:
+            import archive
+            from config import CACHE_DIR
+
+            store_path = os.path.join(CACHE_DIR, "games", f"{args.user.lower()}.json")
+            store = archive.GameStore(store_path).load()
+            mainlines.append(record_mainlines(store.games))
+        if not mainlines:
+            parser.error("give --pgn files and/or --user")
+        count = build_book(
+            (m for source in mainlines for m in source), args.out, args.plies
+        )
+        print(f"Wrote {count} entries to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
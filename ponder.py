@@ -0,0 +1,163 @@
+"""
+Speculative pondering for live play.
+
+While the opponent is thinking, a local UCI engine picks the K most likely
+replies (its own multipv ranking) and works out our answer to each. The
+answers sit in a short-lived cache keyed by position, so when the real reply
+is entered the suggestion can be shown without waiting for the server.
+"""
+
+import queue
+import shlex
+import threading
+import time
+
+import chess
+import chess.engine
+
+# Opponent replies pondered per position
+PONDER_REPLIES = 3
+# Engine time for ranking the replies, and for each answer (seconds)
+PONDER_RANK_TIME = 0.3
+PONDER_ANSWER_TIME = 0.2
+# Answers older than this are dropped (seconds)
+PONDER_TTL = 120
+
+
+def position_key(board):
+    """Placement, side to move, castling and en passant; clocks are ignored"""
+    return board.epd()
+
+
+class Ponderer:
+    """
+    One background thread owns the engine. start() hands it the position
+    with the opponent to move; a newer position replaces any pending one and
+    stops work on the old one between answers.
+    - lookup() counts hits and misses
+    - answers that expire or are left over when the next position starts
+      count as wasted
+    """
+
+    def __init__(
+        self, engine_cmd, replies=PONDER_REPLIES, ttl=PONDER_TTL, on_answer=None
+    ):
+        self.engine_cmd = engine_cmd
+        self.on_answer = on_answer  # called with (position key, move) per answer
+        self.replies = replies
+        self.ttl = ttl
+        self.engine = None
+        self.cache = {}  # position key -> (move, created)
+        self.lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.generation = 0
+        self.thread = None
+        self.closed = False
+        self.hits = 0
+        self.misses = 0
+        self.computed = 0
+        self.wasted = 0
+        self.busy_s = 0.0
+
+    def start(self, board):
+        if self.closed:
+            return
+        with self.lock:
+            self.generation += 1
+            # Answers for the previous position that were never used
+            self.wasted += len(self.cache)
+            self.cache.clear()
+        self.jobs.put((self.generation, board.copy()))
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Abandons the current position (e.g. our own move is being sent)"""
+        with self.lock:
+            self.generation += 1
+
+    def close(self):
+        self.closed = True
+        self.stop()
+        self.jobs.put(None)
+        if self.engine:
+            try:
+                self.engine.quit()
+            except Exception:
+                pass
+
+    def lookup(self, board):
+        """Our pondered answer in `board` (the position after their reply), or None"""
+        with self.lock:
+            entry = self.cache.pop(position_key(board), None)
+            if entry and time.time() - entry[1] > self.ttl:
+                self.wasted += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    # -------------------- Worker --------------------
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            # Only the newest position is worth pondering
+            while job is not None and not self.jobs.empty():
+                job = self.jobs.get()
+            if job is None:
+                return
+            try:
+                self.ponder(*job)
+            except Exception:
+                if self.closed:
+                    return
+                # A dead engine is restarted on the next position
+                self.engine = None
+
+    def current(self, generation):
+        return generation == self.generation and not self.closed
+
+    def ponder(self, generation, board):
+        if board.is_game_over() or not self.current(generation):
+            return
+        if self.engine is None:
+            self.engine = chess.engine.SimpleEngine.popen_uci(
+                shlex.split(self.engine_cmd)
+            )
+        t0 = time.perf_counter()
+        infos = self.engine.analyse(
+            board, chess.engine.Limit(time=PONDER_RANK_TIME), multipv=self.replies
+        )
+        replies = [info["pv"][0] for info in infos if info.get("pv")]
+        for reply in replies:
+            if not self.current(generation):
+                break
+            after = board.copy()
+            after.push(reply)
+            if after.is_game_over():
+                continue
+            result = self.engine.play(
+                after, chess.engine.Limit(time=PONDER_ANSWER_TIME)
+            )
+            if result.move is None:
+                continue
+            with self.lock:
+                if generation != self.generation:
+                    break
+                self.cache[position_key(after)] = (result.move, time.time())
+                self.computed += 1
+            if self.on_answer:
+                self.on_answer(position_key(after), result.move)
+        self.busy_s += time.perf_counter() - t0
+
+    def report(self):
+        lookups = self.hits + self.misses
+        rate = self.hits * 100 / lookups if lookups else 0
+        return (
+            f"Ponder: {self.hits}/{lookups} hits ({rate:.0f}%), "
+            f"{self.computed} answers computed, {self.wasted} wasted, "
+            f"{self.busy_s:.1f}s engine time"
+        )
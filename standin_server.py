@@ -0,0 +1,315 @@
+"""
+Local stand-in for the game server's websocket, for testing the client
+without the SpringBoot backend.
+
+It speaks the same protocol (init from side, PGN or FEN + moves, next_move,
+undo, promote, select_bot)
+and, while "thinking", streams interim analysis frames before the final
+engine_move:
+
+    {"type": "analysis", "depth": 9, "multipv": 1, "score": {"cp": 34},
+     "pv": ["e7e5", "g1f3"]}
+
+A {"action": "stop"} ends the search and the best line so far is played.
+When the opponent's move ends the game, a {"type": "game_over", "result",
+"state"} frame is sent instead of an engine_move.
+The engine_level sent with select_bot sets the search depth.
+Every connection is a game of its own, so the client's multi-bot shadow
+sessions can be pointed here (CHESS_FANOUT_URL=ws://127.0.0.1:8000/ws).
+Without --engine the analysis is faked from a one-ply material count.
+
+Usage:
+    python standin_server.py [--port 8000] [--engine stockfish] [--multipv 3]
+    (then point API_URL in chess_client.py at it)
+"""
+
+import argparse
+import asyncio
+import io
+import random
+import shlex
+
+import chess
+import chess.engine
+import chess.pgn
+
+import transport
+
+PIECE_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 300,
+    chess.BISHOP: 320,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 0,
+}
+
+BOTS = [
+    {"id": "standin-1", "name": "Stand-in", "rating": 1500, "avatar": ""},
+    {"id": "standin-2", "name": "Stand-in Strong", "rating": 2200, "avatar": ""},
+]
+
+
+def state_from_board(board):
+    return {
+        chess.square_name(sq): ("w" if piece.color else "b") + piece.symbol().upper()
+        for sq, piece in board.piece_map().items()
+    }
+
+
+def material(board, color):
+    return sum(
+        PIECE_VALUES[p.piece_type] * (1 if p.color == color else -1)
+        for p in board.piece_map().values()
+    )
+
+
+# -------------------- Session --------------------
+class Session:
+    def __init__(self, ws, args):
+        self.ws = ws
+        self.args = args
+        self.board = chess.Board()
+        self.bot = BOTS[0]
+        self.promotion = chess.QUEEN
+        self.depth = args.depth
+        self.stop = asyncio.Event()
+        self.thinking = None
+        self.engine = None
+
+    async def send(self, payload):
+        await self.ws.send(transport.encode(payload, transport.codec_for(self.ws)))
+
+    async def handle(self, data):
+        action = data.get("action")
+        if action == "init":
+            self.init(data)
+            await self.send(
+                {
+                    "type": "init",
+                    "current_bot": self.bot,
+                    "bots": BOTS,
+                    "state": state_from_board(self.board),
+                    "status": "Game started",
+                }
+            )
+            # The engine moves first when it plays white
+            if data.get("side") == "white":
+                self.thinking = asyncio.ensure_future(self.think())
+        elif action == "next_move":
+            move = self.parse_move(data.get("opponent_move", ""))
+            if move is None:
+                await self.send({"error": "Illegal move"})
+                return
+            self.board.push(move)
+            self.thinking = asyncio.ensure_future(self.think())
+        elif action == "undo":
+            for _ in range(min(2, len(self.board.move_stack))):
+                self.board.pop()
+            await self.send({"state": state_from_board(self.board), "status": "Undone"})
+        elif action == "promote":
+            piece = chess.Piece.from_symbol(data.get("piece", "q")).piece_type
+            self.promotion = piece
+            await self.send({"status": f"Promotion piece {chess.piece_name(piece)}"})
+        elif action == "select_bot":
+            bot_id = data.get("bot_id") or data.get("bot")
+            self.bot = next(
+                (b for b in BOTS if bot_id in (b["id"], b["name"])), self.bot
+            )
+            # The engine level stands in for search depth
+            self.depth = int(data.get("engine_level") or self.args.depth)
+            await self.send(
+                {"status": f"Bot {self.bot['name']} selected, depth {self.depth}"}
+            )
+        else:
+            await self.send({"error": f"Unknown action {action!r}"})
+
+    def init(self, data):
+        self.board = chess.Board()
+        if data.get("fen"):
+            self.board = chess.Board(data["fen"])
+            for uci in data.get("moves", []):
+                self.board.push_uci(uci)
+        elif data.get("pgn"):
+            game = chess.pgn.read_game(io.StringIO(data["pgn"]))
+            board = game.board()
+            for ply, move in enumerate(game.mainline_moves()):
+                if ply >= data.get("move_no", 0):
+                    break
+                board.push(move)
+            self.board = board
+
+    def parse_move(self, text):
+        try:
+            move = chess.Move.from_uci(text)
+        except ValueError:
+            return None
+        piece = self.board.piece_at(move.from_square)
+        if (
+            piece
+            and piece.piece_type == chess.PAWN
+            and chess.square_rank(move.to_square) in (0, 7)
+            and not move.promotion
+        ):
+            move.promotion = self.promotion
+        return move if self.board.is_legal(move) else None
+
+    # -------------------- Thinking --------------------
+    async def think(self):
+        self.stop.clear()
+        if self.board.is_game_over():
+            # Terminal frame in place of the engine_move the client waits for
+            await self.send(
+                {
+                    "type": "game_over",
+                    "result": self.board.result(),
+                    "state": state_from_board(self.board),
+                    "status": f"Game over {self.board.result()}",
+                }
+            )
+            return
+        if self.args.engine:
+            best = await self.engine_search()
+        else:
+            best = await self.fake_search()
+        # The suggestion is assumed played, as on the real server
+        self.board.push(best)
+        await self.send(
+            {
+                "type": "engine_move",
+                "move": {
+                    "from": chess.square_name(best.from_square),
+                    "to": chess.square_name(best.to_square),
+                },
+                "state": state_from_board(self.board),
+                "status": f"{self.bot['name']} suggests {best.uci()}",
+            }
+        )
+
+    async def fake_search(self):
+        """Ranks moves by material after one ply, with noise shrinking by depth"""
+        mover = self.board.turn
+        best = None
+        for depth in range(1, self.depth + 1):
+            scored = []
+            for move in self.board.legal_moves:
+                self.board.push(move)
+                cp = material(self.board, mover) + random.gauss(0, 80 / depth)
+                self.board.pop()
+                scored.append((cp, move))
+            scored.sort(key=lambda s: -s[0])
+            for index, (cp, move) in enumerate(scored[: self.args.multipv], start=1):
+                await self.send(
+                    {
+                        "type": "analysis",
+                        "depth": depth,
+                        "multipv": index,
+                        "score": {"cp": int(cp)},
+                        "pv": [move.uci()],
+                    }
+                )
+            best = scored[0][1]
+            try:
+                await asyncio.wait_for(self.stop.wait(), self.args.step)
+                break
+            except asyncio.TimeoutError:
+                pass
+        return best
+
+    async def engine_search(self):
+        if self.engine is None:
+            _, self.engine = await chess.engine.popen_uci(shlex.split(self.args.engine))
+        best = None
+        limit = chess.engine.Limit(depth=self.depth)
+        with await self.engine.analysis(
+            self.board, limit, multipv=self.args.multipv
+        ) as analysis:
+            async for info in analysis:
+                if "pv" not in info or "depth" not in info:
+                    continue
+                score = info["score"].relative
+                index = info.get("multipv", 1)
+                await self.send(
+                    {
+                        "type": "analysis",
+                        "depth": info["depth"],
+                        "multipv": index,
+                        "score": (
+                            {"mate": score.mate()}
+                            if score.is_mate()
+                            else {"cp": score.score()}
+                        ),
+                        "pv": [m.uci() for m in info["pv"]],
+                    }
+                )
+                if index == 1:
+                    best = info["pv"][0]
+                if self.stop.is_set():
+                    analysis.stop()
+        if best is None:
+            best = (await self.engine.play(self.board, limit)).move
+        return best
+
+
+def start(args):
+    """
+    The stand-in's websockets server, to be used with `async with`;
+    port 0 picks a free port (see server.sockets)
+    """
+    import websockets
+
+    async def handler(ws, path=None):
+        session = Session(ws, args)
+        try:
+            async for message in ws:
+                data = transport.decode(message)
+                if data.get("action") == "stop":
+                    session.stop.set()
+                    continue
+                # One search at a time, as on the real server
+                if session.thinking and not session.thinking.done():
+                    await session.thinking
+                await session.handle(data)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            session.stop.set()
+            if session.engine:
+                await session.engine.quit()
+
+    protocols = [transport.JSON_PROTOCOL] if args.json else transport.subprotocols()
+    return websockets.serve(
+        handler,
+        args.host,
+        args.port,
+        compression=None,
+        extensions=transport.server_extensions(),
+        subprotocols=protocols,
+    )
+
+
+async def serve(args):
+    async with start(args):
+        print(f"Stand-in server on ws://{args.host}:{args.port}/ws")
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--engine", help="UCI engine command (default: fake search)")
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--multipv", type=int, default=3)
+    parser.add_argument(
+        "--step", type=float, default=0.25, help="seconds per fake search depth"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="refuse MessagePack, JSON frames only"
+    )
+    args = parser.parse_args()
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
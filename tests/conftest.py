@@ -0,0 +1,50 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import chess
+import pytest
+
+# The modules under test are top-level scripts in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class RecordingUI:
+    """UIDispatcher stand-in that keeps the posted updates instead of running them"""
+
+    def __init__(self):
+        self.posted = []
+
+    def post(self, key, fn, *args):
+        self.posted.append((key, args))
+
+
+@pytest.fixture
+def bare_client(monkeypatch):
+    """
+    A ChessClient without Tk: only the state the mirror, premove and frame
+    handling code uses, positioned at the start of a game.
+    """
+    import chess_client
+
+    monkeypatch.setattr(chess_client, "log_info", lambda message: None)
+    client = object.__new__(chess_client.ChessClient)
+    widget = SimpleNamespace(set=None, config=None, after=None)
+    client.ui = RecordingUI()
+    client.status = widget
+    client._board_frame = SimpleNamespace(
+        update_board=None, mark_premoves=None, mark_alternatives=None, **vars(widget)
+    )
+    client.mirror = chess.Board()
+    client.confirmed_boards = [client.mirror.copy()]
+    client.mirror_lock = threading.Lock()
+    client.optimistic = None
+    client.premoves = []
+    client.last_sent = None
+    client.undos_pending = 0
+    client.promotion_choice = None
+    client.history = None
+    client.scrub_ply = None
+    client.engine_move_pending = False
+    return client
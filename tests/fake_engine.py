@@ -0,0 +1,40 @@
+"""
+Minimal UCI engine for tests, with a scripted evaluation: level until
+BLUNDER_PLY plies have been played, then BLUNDER_CP in black's favour.
+"""
+
+import sys
+
+BLUNDER_PLY = 3
+BLUNDER_CP = 400
+
+
+def score(plies):
+    """Score for the side to move after `plies` plies"""
+    if plies < BLUNDER_PLY:
+        return 0
+    # Black to move after an odd number of plies
+    return BLUNDER_CP if plies % 2 else -BLUNDER_CP
+
+
+def main():
+    plies = 0
+    for line in sys.stdin:
+        cmd = line.split()
+        if not cmd:
+            continue
+        if cmd[0] == "uci":
+            print("id name fake\nuciok", flush=True)
+        elif cmd[0] == "isready":
+            print("readyok", flush=True)
+        elif cmd[0] == "position":
+            plies = len(cmd) - cmd.index("moves") - 1 if "moves" in cmd else 0
+        elif cmd[0] == "go":
+            print(f"info depth 1 score cp {score(plies)}", flush=True)
+            print("bestmove 0000", flush=True)
+        elif cmd[0] == "quit":
+            break
+
+
+if __name__ == "__main__":
+    main()
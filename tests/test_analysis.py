@@ -0,0 +1,84 @@
+import json
+import os
+import sys
+
+import analysis
+
+FAKE_ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_engine.py")
+ENGINE_CMD = f'"{sys.executable}" "{FAKE_ENGINE}"'
+
+
+def make_game(uuid, movetext="1. e4 e5 2. Nf3 Nc6 3. Bb5 a6"):
+    return {
+        "uuid": uuid,
+        "white": {"username": "alice"},
+        "black": {"username": "bob"},
+        "pgn": f'[White "alice"]\n[Black "bob"]\n\n{movetext} *\n',
+    }
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_classify_thresholds():
+    assert analysis.classify(analysis.BLUNDER) == "blunder"
+    assert analysis.classify(analysis.MISTAKE) == "mistake"
+    assert analysis.classify(analysis.INACCURACY) == "inaccuracy"
+    assert analysis.classify(analysis.INACCURACY - 1) == ""
+
+
+def test_archive_is_analysed_and_classified(tmp_path):
+    out = str(tmp_path / "results.jsonl")
+    games = [make_game("g1"), make_game("g2")]
+
+    assert analysis.analyse_archive(games, ENGINE_CMD, out, depth=1, workers=2) == 2
+
+    results = {r["uuid"]: r for r in read_results(out)}
+    assert set(results) == {"g1", "g2"}
+    game = results["g1"]
+    assert [m["san"] for m in game["moves"]] == ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6"]
+    # The fake engine swings 400cp to black after white's second move
+    assert game["moves"][2]["class"] == "blunder"
+    assert game["moves"][2]["loss"] == 400
+    assert game["summary"]["white"]["blunder"] == 1
+    assert game["summary"]["black"] == {"inaccuracy": 0, "mistake": 0, "blunder": 0}
+
+
+def test_rerun_skips_finished_games(tmp_path):
+    out = str(tmp_path / "results.jsonl")
+    games = [make_game("g1")]
+    analysis.analyse_archive(games, ENGINE_CMD, out, depth=1, workers=1)
+
+    assert analysis.analyse_archive(games, ENGINE_CMD, out, depth=1, workers=1) == 0
+    assert len(read_results(out)) == 1
+
+
+def test_torn_last_line_is_dropped_before_appending(tmp_path):
+    out = str(tmp_path / "results.jsonl")
+    analysis.analyse_archive([make_game("g1")], ENGINE_CMD, out, depth=1, workers=1)
+    # An interrupted write of the next record
+    with open(out, "a", encoding="utf-8") as f:
+        f.write('{"uuid": "g2", "moves": [')
+
+    games = [make_game("g1"), make_game("g2"), make_game("g3")]
+    assert analysis.analyse_archive(games, ENGINE_CMD, out, depth=1, workers=1) == 2
+
+    assert sorted(r["uuid"] for r in read_results(out)) == ["g1", "g2", "g3"]
+    assert analysis.load_done(out) == {"g1", "g2", "g3"}
+
+
+def test_drop_torn_line_keeps_complete_files(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_bytes(b'{"uuid": "a"}\n{"uuid": "b"}\n')
+    analysis.drop_torn_line(str(path))
+    assert path.read_bytes() == b'{"uuid": "a"}\n{"uuid": "b"}\n'
+
+    path.write_bytes(b'{"uuid": "a"}\n{"uu')
+    analysis.drop_torn_line(str(path))
+    assert path.read_bytes() == b'{"uuid": "a"}\n'
+
+    path.write_bytes(b'{"uu')
+    analysis.drop_torn_line(str(path))
+    assert path.read_bytes() == b""
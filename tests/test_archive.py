@@ -0,0 +1,206 @@
+import json
+import random
+import zlib
+
+import chess
+import pytest
+from chess import pgn
+
+import archive
+
+
+# -------------------- Incremental Parsing --------------------
+def test_json_array_items_across_chunks():
+    chunks = ['{"games": [{"uuid": "a"', '}, {"uuid": ', '"b"}', "]}"]
+    assert list(archive.iter_json_array(chunks)) == [{"uuid": "a"}, {"uuid": "b"}]
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        ['[{"uuid": "a"}, {"uuid": '],  # truncated
+        ['[{"uuid": "a"} {oops}]'],  # malformed
+        ['{"error": "busy"}'],  # no array at all
+    ],
+)
+def test_json_array_that_does_not_close_raises(chunks):
+    items = []
+    with pytest.raises(ValueError):
+        for item in archive.iter_json_array(chunks):
+            items.append(item)
+    assert items in ([], [{"uuid": "a"}])
+
+
+# -------------------- Binary Move Archive --------------------
+def make_records(games):
+    return [
+        archive.GameRecord(
+            f"g{i}", "white", "black", "", 0, 0, zlib.compress(str(g).encode())
+        )
+        for i, g in enumerate(games)
+    ]
+
+
+@pytest.fixture
+def source_games():
+    rng = random.Random(7)
+    games = [archive.random_game(rng, rng.randint(0, 300)) for _ in range(60)]
+    # Custom start position: castling both ways, promotions, en passant
+    custom = pgn.Game.from_board(
+        chess.Board("r3k2r/1P6/8/3pP3/8/8/6p1/R3K2R w KQkq d6 0 1")
+    )
+    node = custom
+    for uci in ("e5d6", "g2g1n", "e1c1", "e8g8", "b7a8q"):
+        node = node.add_main_variation(chess.Move.from_uci(uci))
+    games.append(custom)
+    return games
+
+
+def test_move_codes_cover_every_promotion():
+    for promotion in (None, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+        move = chess.Move(chess.B7, chess.A8, promotion)
+        assert archive.decode_move(archive.encode_move(move)) == move
+
+
+def test_archive_round_trip_matches_python_chess(tmp_path, source_games):
+    path = str(tmp_path / "games.moves")
+    archive.export_archive(make_records(source_games), path)
+
+    reader = archive.MoveArchive(path)
+    try:
+        assert len(reader) == len(source_games)
+        for i, game in enumerate(source_games):
+            expected = list(game.mainline_moves())
+            assert reader.header(i)["uuid"] == f"g{i}"
+            assert reader.halfmove_count(i) == len(expected)
+            assert reader.moves(i) == expected
+            assert reader.start_board(i).fen() == game.board().fen()
+            # Random access to every ply against a python-chess replay
+            board = game.board()
+            for ply, move in enumerate(expected, start=1):
+                board.push(move)
+                assert reader.moves(i, ply) == expected[:ply]
+                if ply % 23 == 0 or ply == len(expected):
+                    assert reader.board_at(i, ply).fen() == board.fen()
+    finally:
+        reader.close()
+
+
+def test_reexport_copies_known_games(tmp_path, source_games):
+    path = str(tmp_path / "games.moves")
+    records = make_records(source_games)
+    archive.export_archive(records[:-10], path)
+    previous = archive.MoveArchive(path)
+    archive.export_archive(records, path, previous=previous)
+
+    reader = archive.MoveArchive(path)
+    try:
+        for i, game in enumerate(source_games):
+            assert reader.moves(i) == list(game.mainline_moves())
+    finally:
+        reader.close()
+
+
+def test_import_regenerates_the_mainlines(tmp_path, source_games):
+    path = str(tmp_path / "games.moves")
+    archive.export_archive(make_records(source_games), path)
+
+    imported = list(archive.import_archive(path))
+    assert [g.uuid for g in imported] == [f"g{i}" for i in range(len(source_games))]
+    for record, game in zip(imported, source_games):
+        board, moves = record.read_mainline()
+        assert board.fen() == game.board().fen()
+        assert moves == list(game.mainline_moves())
+        assert record.halfmove_count == len(moves)
+
+
+# -------------------- Archive Sync --------------------
+API = "http://chess.test"
+MARCH_2024 = 1710000000  # 2024-03-09
+
+
+def server_game(uuid, end_time):
+    return {
+        "uuid": uuid,
+        "end_time": end_time,
+        "white": {"username": "alice", "result": "win"},
+        "black": {"username": "bob", "result": "resigned"},
+        "pgn": "1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0",
+    }
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def json(self):
+        return self.body
+
+    def iter_content(self, chunk_size):
+        yield json.dumps(self.body).encode()
+
+
+class FakeServer:
+    """Documents by URL; anything else is a 404"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        if url in self.documents:
+            return FakeResponse(200, self.documents[url])
+        return FakeResponse(404, {"error": "not found"})
+
+
+def synced_store(tmp_path, games):
+    store = archive.GameStore(str(tmp_path / "games" / "alice.json"))
+    store.merge([archive.make_record(g) for g in games])
+    store.save()
+    return store
+
+
+def test_paged_sync_fetches_indexed_months_from_the_cursor(tmp_path):
+    store = synced_store(tmp_path, [server_game("old", MARCH_2024)])
+    store.paged = True
+    user = f"{API}/api/chess/games/alice"
+    server = FakeServer(
+        {
+            # 2024/04 is in the index but has no document
+            f"{user}/archives": ["2024/01", "2024/02", "2024/03", "2024/04", "2024/05"],
+            f"{user}/2024/03": [server_game("old", MARCH_2024)],
+            f"{user}/2024/05": [server_game("may", MARCH_2024 + 60 * 86400)],
+        }
+    )
+
+    new = archive.sync_archive(API, "alice", store, lambda batch: None, http=server)
+
+    assert new == 1
+    assert sorted(server.requested[1:]) == [f"{user}/2024/0{m}" for m in (3, 4, 5)]
+    reloaded = archive.GameStore(store.path).load()
+    assert {g.uuid for g in reloaded.games} == {"old", "may"}
+
+
+@pytest.mark.parametrize("honoured", [True, False])
+def test_since_sync_drops_games_before_the_cursor(tmp_path, honoured):
+    store = synced_store(tmp_path, [server_game("old", MARCH_2024)])
+    newer = server_game("newer", MARCH_2024 + 3600)
+    # A game the store never saw, but older than the cursor
+    older = server_game("older", MARCH_2024 - 3600)
+    user = f"{API}/api/chess/games/alice"
+    body = [newer] if honoured else [older, server_game("old", MARCH_2024), newer]
+    server = FakeServer({f"{user}?since={MARCH_2024}": body})
+
+    new = archive.sync_archive(API, "alice", store, lambda batch: None, http=server)
+
+    assert new == 1
+    assert {g.uuid for g in store.games} == {"old", "newer"}
+    assert archive.GameStore(store.path).load().since_filtered is honoured
@@ -0,0 +1,30 @@
+import asyncio
+import threading
+import time
+
+BOT = {"id": "b1", "name": "Slow Avatar", "rating": 1500, "avatar": "http://x/a.png"}
+
+
+class SlowCatalogue:
+    def avatar(self, bot, http):
+        time.sleep(0.3)
+        return b"png"
+
+
+def test_avatar_download_does_not_hold_the_network_loop(bare_client):
+    bare_client.catalogue = SlowCatalogue()
+    bare_client.http = object()  # http_session() hands this out as is
+    bare_client.http_lock = threading.Lock()
+
+    async def run():
+        t0 = time.perf_counter()
+        bare_client.update_bot_display(BOT)
+        returned_s = time.perf_counter() - t0
+        await asyncio.sleep(0.6)
+        return returned_s
+
+    returned_s = asyncio.run(run())
+
+    assert returned_s < 0.1
+    shown = [args for key, args in bare_client.ui.posted if key == "bot"]
+    assert shown == [(BOT, None), (BOT, b"png")]
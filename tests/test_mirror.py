@@ -0,0 +1,52 @@
+import chess
+
+import chess_client
+
+
+def board_after(*ucis):
+    board = chess.Board()
+    for uci in ucis:
+        board.push_uci(uci)
+    return board
+
+
+def test_repeated_placement_is_a_new_move():
+    # Nf3 Nf6 Ng1, then ...Ng8 brings back the start placement
+    mirror = board_after("g1f3", "g8f6", "f3g1")
+    state = chess_client.state_from_board(board_after("g1f3", "g8f6", "f3g1", "f6g8"))
+
+    synced = chess_client.sync_board(mirror, state)
+
+    assert [m.uci() for m in synced.move_stack] == ["g1f3", "g8f6", "f3g1", "f6g8"]
+
+
+def test_undo_reply_takes_moves_back():
+    mirror = board_after("e2e4", "e7e5", "g1f3", "b8c6")
+    state = chess_client.state_from_board(board_after("e2e4", "e7e5"))
+
+    # Without the undo the same placement is reached by Ng1 Nb8
+    forward = chess_client.sync_board(mirror, state)
+    assert [m.uci() for m in forward.move_stack][4:] == ["f3g1", "c6b8"]
+    synced = chess_client.sync_board(mirror, state, undo=True)
+    assert [m.uci() for m in synced.move_stack] == ["e2e4", "e7e5"]
+
+
+def test_history_keeps_plies_through_a_repetition():
+    mirror = board_after("g1f3", "g8f6", "f3g1")
+    history = chess_client.GameHistory(mirror)
+    state = chess_client.state_from_board(board_after("g1f3", "g8f6", "f3g1", "f6g8"))
+
+    assert history.sync(chess_client.sync_board(mirror, state))
+    assert len(history) == 4
+    assert history.undone == []
+
+
+def test_undone_line_starts_where_it_left_the_mainline():
+    # 1. e4 e5 2. Nf3 Nc6, undo, then 2. Nf3 d6 for a different reply
+    history = chess_client.GameHistory(board_after("e2e4", "e7e5", "g1f3", "b8c6"))
+    assert history.sync(board_after("e2e4", "e7e5"))
+    assert history.sync(board_after("e2e4", "e7e5", "g1f3", "d7d6"))
+
+    movetext = history.to_pgn().split("\n\n")[-1]
+
+    assert movetext == "1. e4 e5 2. Nf3 d6 ( { undone } 2... Nc6 ) *"
@@ -0,0 +1,94 @@
+import chess
+
+import chess_client
+
+PROMOTION_FEN = "8/4P3/8/8/8/8/k7/4K3 w - - 0 1"
+
+
+def test_expected_board_before_anything_was_sent(bare_client):
+    bare_client.queue_premove("e2", "e4")
+
+    board = bare_client.expected_board()
+
+    # The premove, then an unknown reply
+    assert board.piece_at(chess.E4) == chess.Piece(chess.PAWN, chess.WHITE)
+    assert board.move_stack[-1] == chess.Move.null()
+    assert board.turn == chess.WHITE
+
+
+def test_premoves_are_played_after_unknown_replies(bare_client):
+    bare_client.mirror.push_uci("e2e4")
+    bare_client.optimistic = {"before": chess.Board(), "label": "e2e4"}
+    bare_client.queue_premove("d2", "d4")
+    bare_client.queue_premove("g1", "f3")
+
+    board = bare_client.expected_board()
+
+    assert [m.uci() for m in board.move_stack] == [
+        "e2e4",
+        "0000",
+        "d2d4",
+        "0000",
+        "g1f3",
+        "0000",
+    ]
+
+
+def test_impossible_premove_is_not_queued(bare_client):
+    bare_client.queue_premove("e2", "e5")
+    assert bare_client.premoves == []
+
+
+def test_queued_underpromotion_survives_the_reply(bare_client):
+    bare_client.mirror = chess.Board(PROMOTION_FEN)
+    bare_client.mirror.push_uci("e1d1")
+    bare_client.optimistic = {"before": chess.Board(PROMOTION_FEN), "label": "e1d1"}
+    bare_client.queue_premove("e7", "e8", "n")
+
+    expected = bare_client.expected_board()
+    assert expected.piece_at(chess.E8) == chess.Piece(chess.KNIGHT, chess.WHITE)
+
+    # The opponent's reply comes in, then the premove is taken off the queue
+    bare_client.optimistic = None
+    bare_client.mirror.push_uci("a2b2")
+    assert bare_client.next_premove() == ("e7", "e8", "n")
+    assert bare_client.premoves == []
+
+
+def test_sent_promotion_is_kept_in_the_expected_board(bare_client):
+    bare_client.mirror = chess.Board(PROMOTION_FEN)
+    bare_client.last_sent = ("e7", "e8", "r")
+
+    board = bare_client.expected_board()
+
+    assert board.piece_at(chess.E8) == chess.Piece(chess.ROOK, chess.WHITE)
+
+
+def test_premove_illegal_after_the_reply_drops_the_queue(bare_client):
+    bare_client.mirror.push_uci("e2e4")
+    bare_client.optimistic = {"before": chess.Board(), "label": "e2e4"}
+    bare_client.queue_premove("e4", "e5")
+    bare_client.queue_premove("d2", "d4")
+
+    # ...e5 blocks the pawn
+    bare_client.optimistic = None
+    bare_client.mirror.push_uci("e7e5")
+
+    assert bare_client.next_premove() is None
+    assert bare_client.premoves == []
+
+
+def test_underpromotion_is_shown_and_confirmed_without_rollback(bare_client):
+    bare_client.mirror = chess.Board(PROMOTION_FEN)
+    bare_client.confirmed_boards = [bare_client.mirror.copy()]
+    server = chess.Board(PROMOTION_FEN)
+    server.push_uci("e7e8n")
+    server.push_uci("a2b2")
+
+    after = bare_client.apply_optimistic_move("e7", "e8", "n")
+    assert after.piece_at(chess.E8) == chess.Piece(chess.KNIGHT, chess.WHITE)
+    bare_client.sync_mirror(chess_client.state_from_board(server))
+
+    assert [m.uci() for m in bare_client.mirror.move_stack] == ["e7e8n", "a2b2"]
+    statuses = [args[0] for key, args in bare_client.ui.posted if key == "status"]
+    assert not any("Rollback" in s for s in statuses)
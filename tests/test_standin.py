@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import threading
+import time
+
+import chess
+import pytest
+
+import catalogue
+import standin_server
+import transport
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+
+
+def standin_args(**overrides):
+    args = dict(host="127.0.0.1", port=0, engine=None, depth=12, multipv=3, step=0.05)
+    args.update(overrides, json=False)
+    return argparse.Namespace(**args)
+
+
+@pytest.fixture
+def client(bare_client, tmp_path):
+    """bare_client plus what the game socket path uses, before the init frame"""
+    c = bare_client
+    c.mirror = None
+    c.ws = None
+    c.codec = None
+    c.worker = None
+    c.recorder = None
+    c.fanout = None
+    c.ponderer = None
+    c.init_mode = "pgn"
+    c.init_note = ""
+    c.waiting_for_init = True
+    c.pending_selection = None
+    c.game_requested_at = time.perf_counter()
+    c.socket_source = "new"
+    c.start_board = None
+    c.pgn = None
+    c.move_no = 0
+    c.side = None
+    c.catalogue = catalogue.BotCatalogue(str(tmp_path / "bots.json"))
+    c.update_bot_display = lambda bot: setattr(c, "primary_bot", bot["name"])
+    c.analysis = {}
+    c.pending_note = ""
+    c.move_sent_at = None
+    c.consensus = {}
+    c.consensus_lock = threading.Lock()
+    c.bot_latency = {}
+    return c
+
+
+def against_standin(client, fen, play, **args):
+    """Starts a game from `fen` on a stand-in on a free port, then runs play(ws)"""
+
+    async def run():
+        async with standin_server.start(standin_args(**args)) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with transport.connect(f"ws://127.0.0.1:{port}/ws") as ws:
+                client.ws, client.codec = ws, transport.codec_for(ws)
+                client.start_board = chess.Board(fen)
+                await client.send_message({"action": "init", "fen": fen, "moves": []})
+                await client.handle_frame(transport.decode(await ws.recv()))
+                return await play(ws)
+
+    return asyncio.run(run())
+
+
+async def enter_move(client, f, t):
+    # What begin_move does before the move goes out, without the status thread
+    client.engine_move_pending = True
+    client.apply_optimistic_move(f, t)
+    await client.send_move(f, t)
+
+
+async def frames_until(client, ws, done):
+    """Hands every frame to the client until done(frame) holds; returns that frame"""
+    while True:
+        data = transport.decode(await asyncio.wait_for(ws.recv(), 5))
+        await client.handle_frame(data)
+        if done(data):
+            return data
+
+
+def test_analysis_then_stop_plays_the_best_line(client):
+    async def play(ws):
+        await enter_move(client, "e2", "e4")
+        # A long step per depth: only the stop ends this search
+        await frames_until(client, ws, lambda d: len(client.analysis) == 3)
+        assert client.engine_move_pending
+        assert client.pending_note.startswith("Depth 1\n1.")
+        best = client.analysis[1]["pv"][0]
+
+        t0 = time.perf_counter()
+        await client.send_message({"action": "stop"})
+        reply = await frames_until(client, ws, lambda d: d.get("type") == "engine_move")
+        return best, reply, time.perf_counter() - t0
+
+    best, reply, stop_s = against_standin(client, chess.STARTING_FEN, play, step=30)
+
+    assert stop_s < 5
+    assert reply["move"]["from"] + reply["move"]["to"] == best[:4]
+    assert not client.engine_move_pending
+    assert [m.uci() for m in client.mirror.move_stack] == ["e2e4", best]
+
+
+def test_game_over_ends_the_wait_for_a_reply(client):
+    async def play(ws):
+        await enter_move(client, "a1", "a8")
+        return await frames_until(client, ws, lambda d: "state" in d)
+
+    frame = against_standin(client, MATE_IN_ONE, play)
+
+    assert frame["type"] == "game_over" and frame["result"] == "1-0"
+    assert not client.engine_move_pending
+    assert client.analysis == {}
+    assert client.mirror.is_checkmate()
+    assert "export" in [key for key, _ in client.ui.posted]
+
+
+def test_analysis_frame_without_depth(client):
+    client.engine_move_pending = True
+
+    asyncio.run(client.handle_frame({"type": "analysis", "pv": ["e7e5"]}))
+
+    assert client.analysis[1]["depth"] == 0
+    assert client.pending_note.startswith("Depth 0")
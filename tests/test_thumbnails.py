@@ -0,0 +1,26 @@
+import threading
+
+import thumbnails
+
+
+def test_fetch_passes_results_and_failures(tmp_path):
+    cache = thumbnails.ThumbnailCache(str(tmp_path))
+    results = {}
+    done = threading.Event()
+
+    def on_ready(key, result):
+        results[key] = result
+        if len(results) == 2:
+            done.set()
+
+    def broken():
+        raise OSError("avatar server down")
+
+    try:
+        cache.fetch("ok", lambda: "image", on_ready)
+        cache.fetch("broken", broken, on_ready)
+        assert done.wait(2)
+    finally:
+        cache.close()
+
+    assert results == {"ok": "image", "broken": None}
@@ -0,0 +1,23 @@
+import chess
+import pytest
+
+import chess_client
+
+
+@pytest.mark.parametrize(
+    "text, uci", [("Nf3", "g1f3"), ("e2e4", "e2e4"), (" e4 ", "e2e4")]
+)
+def test_typed_moves_resolve(text, uci):
+    assert chess_client.resolve_typed_move(chess.Board(), text).uci() == uci
+
+
+@pytest.mark.parametrize("text", ["", "--", "0000", "Z0", "e2e5", "Nf6"])
+def test_null_and_illegal_moves_are_rejected(text):
+    with pytest.raises(ValueError):
+        chess_client.resolve_typed_move(chess.Board(), text)
+
+
+def test_typed_underpromotion_keeps_the_piece():
+    board = chess.Board("8/4P3/8/8/8/8/k7/4K3 w - - 0 1")
+    assert chess_client.resolve_typed_move(board, "e7e8n").promotion == chess.KNIGHT
+    assert chess_client.resolve_typed_move(board, "e8=R").promotion == chess.ROOK
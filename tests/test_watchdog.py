@@ -0,0 +1,37 @@
+import time
+
+import chess_client
+
+
+class FrozenRoot:
+    """A Tk root whose loop never runs the scheduled heartbeat"""
+
+    def after(self, ms, callback):
+        pass
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_stall_is_reported_before_the_loop_recovers(monkeypatch):
+    logged = []
+    monkeypatch.setattr(chess_client, "log_info", logged.append)
+    watchdog = chess_client.LoopWatchdog(FrozenRoot(), interval=0.01, threshold=0.05)
+    watchdog.start()
+    try:
+        assert wait_for(lambda: logged)
+        assert logged[0].startswith("[Stall] Tk loop blocked for over")
+        assert "test_stall_is_reported_before_the_loop_recovers" in logged[0]
+
+        watchdog.heartbeat()
+        assert wait_for(lambda: len(logged) == 2)
+        assert logged[1].startswith("[Stall] Tk loop recovered after")
+        assert watchdog.stalls == 1
+    finally:
+        watchdog.stop()
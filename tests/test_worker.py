@@ -0,0 +1,47 @@
+import queue
+
+import chess
+import pytest
+
+import chess_client
+import worker
+
+
+@pytest.fixture
+def block():
+    block = worker.BoardBlock()
+    yield block
+    block.close()
+
+
+def state_after(*ucis):
+    board = chess.Board()
+    for uci in ucis:
+        board.push_uci(uci)
+    return chess_client.state_from_board(board)
+
+
+def test_block_keeps_promotion_suggestions(block):
+    state = state_after("e2e4")
+    block.write(state, "e7e8q", depth=12, score={"cp": 35})
+
+    seq, read_state, suggestion, depth, score = block.read()
+
+    assert seq == 2
+    assert read_state == state
+    assert (suggestion, depth, score) == ("e7e8q", 12, {"cp": 35})
+
+
+def test_each_event_carries_its_own_state(block):
+    loop = worker.WorkerLoop(block, None, queue.Queue(), "ws://unused", None)
+    first, second = state_after("e2e4", "e7e5"), state_after("e2e4", "e7e5", "g1f3")
+
+    # Two state frames before the GUI polls
+    loop.route(
+        {"type": "engine_move", "move": {"from": "e7", "to": "e5"}, "state": first}
+    )
+    loop.route({"type": "status", "state": second})
+
+    events = [loop.events.get_nowait() for _ in range(2)]
+    assert [worker.decode_state(e["squares"]) for e in events] == [first, second]
+    assert block.read()[1] == second
@@ -0,0 +1,166 @@
+"""
+Board thumbnails for the game list.
+
+Positions are rendered with Pillow on a small thread pool and cached on disk
+as PNG by game uuid and ply, so a game's final position is only ever drawn
+once. Requests that are still queued can be cancelled, e.g. when the rows
+they were made for scroll out of view.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+THUMB_SIZE = 128
+THUMB_WORKERS = 2
+LIGHT = "#eeeed2"
+DARK = "#769656"
+HIGHLIGHT = "#f7ec6f"
+PIECE_GLYPHS = {
+    "P": "♙",
+    "N": "♘",
+    "B": "♗",
+    "R": "♖",
+    "Q": "♕",
+    "K": "♔",
+    "p": "♟",
+    "n": "♞",
+    "b": "♝",
+    "r": "♜",
+    "q": "♛",
+    "k": "♚",
+}
+
+
+def piece_font(size):
+    """A font with the chess glyphs, or None to draw letters instead"""
+    for name in ("DejaVuSans.ttf", "seguisym.ttf", "Arial Unicode.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return None
+
+
+def render(board, size=THUMB_SIZE, font=None):
+    """The position from white's side, last move highlighted"""
+    square = size // 8
+    img = Image.new("RGB", (square * 8, square * 8))
+    draw = ImageDraw.Draw(img)
+    last = board.peek() if board.move_stack else None
+    marked = {last.from_square, last.to_square} if last else set()
+    for sq in range(64):
+        file, rank = sq % 8, sq // 8
+        x, y = file * square, (7 - rank) * square
+        color = LIGHT if (file + rank) % 2 else DARK
+        if sq in marked:
+            color = HIGHLIGHT
+        draw.rectangle([x, y, x + square - 1, y + square - 1], fill=color)
+        piece = board.piece_at(sq)
+        if piece is None:
+            continue
+        symbol = piece.symbol()
+        if font is not None:
+            draw.text(
+                (x + square / 2, y + square / 2),
+                PIECE_GLYPHS[symbol],
+                fill="black",
+                font=font,
+                anchor="mm",
+            )
+        else:
+            ink = "white" if piece.color else "black"
+            draw.ellipse([x + 2, y + 2, x + square - 3, y + square - 3], fill=ink)
+            draw.text(
+                (x + square / 2 - 3, y + square / 2 - 5),
+                symbol.upper(),
+                fill="black" if piece.color else "white",
+            )
+    return img
+
+
+class ThumbnailCache:
+    """
+    request() returns at once; the PNG path is passed to on_ready(path) on
+    a pool thread, straight away if it is already on disk.
+    - keep_only() cancels queued requests outside the given keys
+    - a key is (game uuid, ply), ply None for the final position
+    - fetch() runs other image loads on the same pool
+    """
+
+    def __init__(self, directory, size=THUMB_SIZE, workers=THUMB_WORKERS):
+        self.directory = directory
+        self.size = size
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="thumbs")
+        self.pending = {}  # key -> Future
+        self.lock = threading.Lock()
+        self.font = piece_font(int(size / 8 * 0.8))
+        self.rendered = 0
+        self.cancelled = 0
+
+    def path(self, uuid, ply):
+        name = f"{uuid}-{'final' if ply is None else ply}-{self.size}.png"
+        return os.path.join(self.directory, name)
+
+    def request(self, game, ply, on_ready):
+        key = (game.uuid, ply)
+        path = self.path(*key)
+        if os.path.exists(path):
+            on_ready(key, path)
+            return
+        with self.lock:
+            if key in self.pending:
+                return
+            future = self.pool.submit(self.render_game, game, ply, path)
+            self.pending[key] = future
+
+        def done(f):
+            with self.lock:
+                self.pending.pop(key, None)
+            if not f.cancelled() and f.exception() is None:
+                on_ready(key, path)
+
+        future.add_done_callback(done)
+
+    def fetch(self, key, fn, on_ready):
+        """
+        Runs fn() on the pool for other small images (bot avatars) and passes
+        (key, result) to on_ready when it is done, result None if fn failed.
+        Pending fetches are cancelled by keep_only() and close() like renders.
+        """
+        with self.lock:
+            if key in self.pending:
+                return
+            future = self.pool.submit(fn)
+            self.pending[key] = future
+
+        def done(f):
+            with self.lock:
+                self.pending.pop(key, None)
+            if not f.cancelled():
+                on_ready(key, f.result() if f.exception() is None else None)
+
+        future.add_done_callback(done)
+
+    def keep_only(self, keys):
+        """Cancels queued renders for other keys (already running ones finish)"""
+        keys = set(keys)
+        with self.lock:
+            stale = [f for key, f in self.pending.items() if key not in keys]
+        for f in stale:
+            if f.cancel():
+                self.cancelled += 1
+
+    def render_game(self, game, ply, path):
+        board, moves = game.read_mainline()
+        for move in moves if ply is None else moves[:ply]:
+            board.push(move)
+        os.makedirs(self.directory, exist_ok=True)
+        render(board, self.size, self.font).save(path + ".tmp", "PNG")
+        os.replace(path + ".tmp", path)
+        self.rendered += 1
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
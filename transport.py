@@ -0,0 +1,142 @@
+"""
+WebSocket transport options shared by the client, the stand-in server and
+the wire benchmark.
+
+- permessage-deflate with tuned window and compression level
+- payload encoding negotiated as a subprotocol: MessagePack (binary frames)
+  when both ends have it, JSON text frames otherwise
+- optional recording of every payload of a session, for `bench.py wire`
+"""
+
+import json
+import threading
+import time
+
+try:
+    import msgpack
+except ImportError:  # optional; JSON is always available
+    msgpack = None
+
+from websockets.extensions.permessage_deflate import (
+    ClientPerMessageDeflateFactory,
+    ServerPerMessageDeflateFactory,
+)
+
+JSON_PROTOCOL = "chess.json"
+MSGPACK_PROTOCOL = "chess.msgpack"
+
+# permessage-deflate tuning: frames are small and repetitive (state dicts,
+# bot lists), so a 32 KiB window buys little over 4 KiB, and level 6 is
+# within a few bytes of level 9 at a fraction of the CPU
+DEFLATE_WINDOW_BITS = 12
+DEFLATE_LEVEL = 6
+DEFLATE_MEM_LEVEL = 5
+
+
+def subprotocols():
+    """Offered encodings, preferred first"""
+    if msgpack is not None:
+        return [MSGPACK_PROTOCOL, JSON_PROTOCOL]
+    return [JSON_PROTOCOL]
+
+
+def deflate_settings(window_bits=DEFLATE_WINDOW_BITS, level=DEFLATE_LEVEL):
+    return {"level": level, "memLevel": DEFLATE_MEM_LEVEL}, window_bits
+
+
+def client_extensions(window_bits=DEFLATE_WINDOW_BITS, level=DEFLATE_LEVEL):
+    """
+    Two deflate offers, tuned first:
+    - the small window on both sides
+    - no window parameters at all, for servers that only do 15 bits
+      (Tomcat, and so Spring) and refuse the first offer
+    """
+    compress_settings, bits = deflate_settings(window_bits, level)
+    return [
+        ClientPerMessageDeflateFactory(
+            server_max_window_bits=bits,
+            client_max_window_bits=bits,
+            compress_settings=compress_settings,
+        ),
+        ClientPerMessageDeflateFactory(compress_settings=compress_settings),
+    ]
+
+
+def server_extensions(window_bits=DEFLATE_WINDOW_BITS, level=DEFLATE_LEVEL):
+    compress_settings, bits = deflate_settings(window_bits, level)
+    return [
+        ServerPerMessageDeflateFactory(
+            server_max_window_bits=bits,
+            client_max_window_bits=bits,
+            compress_settings=compress_settings,
+        )
+    ]
+
+
+def connect(url, **kwargs):
+    """websockets.connect with the tuned deflate settings and codec offer"""
+    import websockets
+
+    return websockets.connect(
+        url,
+        compression=None,
+        extensions=client_extensions(),
+        subprotocols=subprotocols(),
+        **kwargs,
+    )
+
+
+# -------------------- Codec --------------------
+def codec_for(ws):
+    """Encoding agreed during the handshake (JSON if the server chose none)"""
+    if getattr(ws, "subprotocol", None) == MSGPACK_PROTOCOL and msgpack is not None:
+        return MSGPACK_PROTOCOL
+    return JSON_PROTOCOL
+
+
+def encode(payload, codec=JSON_PROTOCOL):
+    if codec == MSGPACK_PROTOCOL:
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload)
+
+
+def decode(frame):
+    """Binary frames are MessagePack, text frames JSON, whatever was agreed"""
+    if isinstance(frame, (bytes, bytearray)):
+        return msgpack.unpackb(frame, raw=False)
+    return json.loads(frame)
+
+
+# -------------------- Session Recording --------------------
+class SessionRecorder:
+    """
+    Appends every payload sent or received to a JSON-lines file:
+    {"t": seconds since start, "dir": "in" | "out", "payload": ...}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.t0 = time.perf_counter()
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def record(self, direction, payload):
+        line = json.dumps(
+            {
+                "t": round(time.perf_counter() - self.t0, 4),
+                "dir": direction,
+                "payload": payload,
+            }
+        )
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def load_session(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
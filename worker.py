@@ -0,0 +1,336 @@
+"""
+Optional out-of-process worker for the client (CHESS_CLIENT_WORKER=1).
+
+The game websocket, frame decoding and the pondering engine run in a child
+process, so bursts of analysis frames never hold the GUI process's GIL. The
+other frames (a handful per move) are still reconciled with the board
+mirror in the GUI process.
+
+GUI -> worker, on a multiprocessing queue:
+    {"cmd": "connect", "payload": {...}}     open the game socket and send init
+    {"cmd": "send", "payload": {...}}        any game socket payload
+    {"cmd": "ponder", "fen": ..., "generation": n} / {"cmd": "ponder_stop"}
+    None                                     shut down
+
+Worker -> GUI:
+    - BoardBlock: the latest server state and best move so far, in shared
+      memory behind a sequence counter (latest wins, nothing queues up)
+    - events queue: every other frame, its state encoded as 64 square bytes
+      ("squares"), so each frame is handled with its own state however many
+      arrive between two polls; analysis frames only go to the block
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+import chess
+
+import ponder
+import transport
+
+# Piece codes in the block: 0 empty, white 1-6, black 9-14 (PNBRQK)
+PIECE_ORDER = "PNBRQK"
+BLACK_BIT = 8
+# seq, then squares a1..h8, suggestion (uci, 5 bytes for promotions), depth,
+# score kind, score
+SEQ = struct.Struct("<Q")
+BODY = struct.Struct("<64s5sHBi")
+BLOCK_SIZE = SEQ.size + BODY.size
+SCORE_CP = 0
+SCORE_MATE = 1
+
+# Events read per GUI poll
+EVENT_BATCH = 64
+
+
+def encode_state(state):
+    squares = bytearray(64)
+    for name, code in state.items():
+        try:
+            sq = chess.parse_square(name)
+            squares[sq] = (PIECE_ORDER.index(code[1]) + 1) | (
+                BLACK_BIT if code[0] == "b" else 0
+            )
+        except (ValueError, IndexError):
+            continue
+    return bytes(squares)
+
+
+def decode_state(squares):
+    state = {}
+    for sq, value in enumerate(squares):
+        if value:
+            color = "b" if value & BLACK_BIT else "w"
+            state[chess.square_name(sq)] = color + PIECE_ORDER[(value & 7) - 1]
+    return state
+
+
+# -------------------- Shared Board Block --------------------
+class BoardBlock:
+    """
+    Fixed-layout shared memory with a seqlock: the single writer makes the
+    counter odd while it writes and even when done; readers retry until
+    they see the same even counter before and after copying the body.
+    """
+
+    def __init__(self, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=BLOCK_SIZE)
+            self.shm.buf[:BLOCK_SIZE] = bytes(BLOCK_SIZE)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.state = b"\0" * 64  # writer's copy of the last state
+
+    def seq(self):
+        return SEQ.unpack_from(self.shm.buf, 0)[0]
+
+    def write(self, state=None, suggestion="", depth=0, score=None):
+        if state is not None:
+            self.state = encode_state(state)
+        kind, value = SCORE_CP, 0
+        if score:
+            kind = SCORE_MATE if "mate" in score else SCORE_CP
+            value = score.get("mate", score.get("cp", 0)) or 0
+        seq = self.seq()
+        SEQ.pack_into(self.shm.buf, 0, seq + 1)
+        BODY.pack_into(
+            self.shm.buf,
+            SEQ.size,
+            self.state,
+            suggestion[:5].encode(),
+            depth,
+            kind,
+            value,
+        )
+        SEQ.pack_into(self.shm.buf, 0, seq + 2)
+
+    def read(self):
+        """(seq, state, suggestion, depth, score) from one consistent write"""
+        while True:
+            before = self.seq()
+            if before & 1:
+                time.sleep(0)
+                continue
+            body = bytes(self.shm.buf[SEQ.size : BLOCK_SIZE])
+            if self.seq() == before:
+                break
+        squares, suggestion, depth, kind, value = BODY.unpack(body)
+        score = {"mate": value} if kind == SCORE_MATE else {"cp": value}
+        suggestion = suggestion.rstrip(b"\0").decode()
+        return before, decode_state(squares), suggestion, depth, score
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# -------------------- Worker Process --------------------
+def run_worker(block_name, commands, events, ws_url, ponder_engine):
+    block = BoardBlock(block_name)
+    try:
+        asyncio.run(WorkerLoop(block, commands, events, ws_url, ponder_engine).run())
+    finally:
+        block.close()
+
+
+class WorkerLoop:
+    def __init__(self, block, commands, events, ws_url, ponder_engine):
+        self.block = block
+        self.commands = commands
+        self.events = events
+        self.ws_url = ws_url
+        self.ws = None
+        self.codec = None
+        self.inbox = None
+        self.ponder_generation = 0
+        self.ponderer = None
+        if ponder_engine:
+            self.ponderer = ponder.Ponderer(ponder_engine, on_answer=self.on_answer)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self.inbox = asyncio.Queue()
+
+        # multiprocessing queues block, so a thread feeds the asyncio queue
+        def feed():
+            while True:
+                cmd = self.commands.get()
+                loop.call_soon_threadsafe(self.inbox.put_nowait, cmd)
+                if cmd is None:
+                    return
+
+        threading.Thread(target=feed, daemon=True).start()
+        reader = None
+        while True:
+            cmd = await self.inbox.get()
+            if cmd is None:
+                break
+            try:
+                if cmd["cmd"] == "connect":
+                    self.ws = await transport.connect(self.ws_url)
+                    self.codec = transport.codec_for(self.ws)
+                    await self.send(cmd["payload"])
+                    reader = asyncio.ensure_future(self.read_frames())
+                elif cmd["cmd"] == "send" and self.ws is not None:
+                    await self.send(cmd["payload"])
+                elif cmd["cmd"] == "ponder" and self.ponderer:
+                    self.ponder_generation = cmd["generation"]
+                    self.ponderer.start(chess.Board(cmd["fen"]))
+                elif cmd["cmd"] == "ponder_stop" and self.ponderer:
+                    self.ponderer.stop()
+            except Exception as e:
+                self.report_error(e)
+        if reader:
+            reader.cancel()
+        if self.ws is not None:
+            await self.ws.close()
+        if self.ponderer:
+            self.ponderer.close()
+
+    async def send(self, payload):
+        await self.ws.send(transport.encode(payload, self.codec))
+
+    async def read_frames(self):
+        try:
+            while True:
+                msg = await self.ws.recv()
+                try:
+                    data = transport.decode(msg)
+                except Exception:
+                    data = {"raw": str(msg)}
+                self.route(data)
+        except Exception as e:
+            self.report_error(e)
+
+    def route(self, data):
+        if data.get("type") == "analysis":
+            if data.get("multipv", 1) == 1 and data.get("pv"):
+                self.block.write(
+                    suggestion=data["pv"][0],
+                    depth=data.get("depth", 0),
+                    score=data.get("score"),
+                )
+            return
+        state = data.pop("state", None)
+        if state:
+            move = data.get("move") or {}
+            suggestion = f"{move.get('from', '')}{move.get('to', '')}"
+            self.block.write(state, suggestion)
+            data["squares"] = self.block.state
+        self.events.put(data)
+
+    def on_answer(self, key, move):
+        # Runs on the ponderer's thread
+        self.events.put(
+            {
+                "type": "ponder",
+                "generation": self.ponder_generation,
+                "key": key,
+                "move": move.uci(),
+            }
+        )
+
+    def report_error(self, e):
+        import websockets
+
+        if isinstance(e, websockets.exceptions.ConnectionClosedError):
+            kind = "closed"
+        elif isinstance(e, (ConnectionRefusedError, OSError)):
+            kind = "refused"
+        else:
+            kind = "error"
+        self.events.put({"type": "worker_error", "kind": kind, "error": str(e)})
+
+
+# -------------------- GUI Side --------------------
+class WorkerClient:
+    """Starts the worker process and talks to it from the GUI process"""
+
+    def __init__(self, ws_url, ponder_engine=None):
+        ctx = multiprocessing.get_context("spawn")
+        self.block = BoardBlock()
+        self.commands = ctx.Queue()
+        self.events = ctx.Queue()
+        self.process = ctx.Process(
+            target=run_worker,
+            args=(self.block.name, self.commands, self.events, ws_url, ponder_engine),
+            daemon=True,
+        )
+        self.process.start()
+        self.last_seq = 0
+
+    def command(self, cmd):
+        self.commands.put(cmd)
+
+    def connect(self, init_payload):
+        self.command({"cmd": "connect", "payload": init_payload})
+
+    def send(self, payload):
+        self.command({"cmd": "send", "payload": payload})
+
+    def snapshot(self):
+        """The block's contents if they changed since the last call, else None"""
+        seq, state, suggestion, depth, score = self.block.read()
+        if seq == self.last_seq:
+            return None
+        self.last_seq = seq
+        return state, suggestion, depth, score
+
+    def poll_events(self, limit=EVENT_BATCH):
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def close(self):
+        self.command(None)
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.block.close()
+
+
+class RemotePonderer(ponder.Ponderer):
+    """
+    GUI-side stand-in for a Ponderer running in the worker: positions go out
+    as commands, answers come back as events, lookups and stats stay local.
+    """
+
+    def __init__(self, client):
+        super().__init__(None)
+        self.client = client
+
+    def start(self, board):
+        with self.lock:
+            self.generation += 1
+            self.wasted += len(self.cache)
+            self.cache.clear()
+        self.client.command(
+            {"cmd": "ponder", "fen": board.fen(), "generation": self.generation}
+        )
+
+    def stop(self):
+        super().stop()
+        self.client.command({"cmd": "ponder_stop"})
+
+    def close(self):
+        self.closed = True
+
+    def add(self, generation, key, move):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.cache[key] = (chess.Move.from_uci(move), time.time())
+            self.computed += 1